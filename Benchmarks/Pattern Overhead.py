@@ -0,0 +1,190 @@
+# Micro-benchmarks for the pattern implementations in this repo
+# The repo shows several ways of doing the same thing: ABC abstract methods (Operation, VideoExporter, Notification), dict dispatch factories
+# (NotificationFactory), three singleton styles and @dataclass observers. This script measures what each of them costs on a hot path:
+# - call/instantiation overhead in ns per call
+# - memory per instance in bytes (tracemalloc, 10,000 instances, the list holding them is allocated before tracing starts)
+# - scaling of Subject.notify with the number of observers
+#
+# Stable and repeatable results:
+# - every case is timed with timeit (garbage collector off while timing), the loop count is picked with autorange so one run takes >= 0.2s
+# - every timed case is a statement string run against a namespace (timeit globals), never a callable or a lambda around one,
+#   so all variants pay the same loop overhead and nobody pays an extra wrapper call
+# - each case is repeated and min/median/stdev are reported, compare the min (least disturbed by the machine) between variants
+# - the examples are loaded from their files with stdout silenced, printing examples are timed with stdout going to os.devnull
+#
+# Output is JSON, e.g.
+#     python "Benchmarks/Pattern Overhead.py" --output results.json
+#     python "Benchmarks/Pattern Overhead.py" --filter singleton --repeat 3
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from abc import ABC, abstractmethod
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_example(relative_path: str, module_name: str):
+    # Example files have spaces in their names and some run a demo at import time, so they are loaded by path with stdout silenced
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def time_case(statement: str, namespace: dict, repeat: int) -> dict:
+    timer = timeit.Timer(statement, globals=namespace)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        number, _ = timer.autorange()
+        number = max(number, 1)
+        timings = [total / number * 1e9 for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "ns_per_call_min": round(min(timings), 1),
+        "ns_per_call_median": round(statistics.median(timings), 1),
+        "ns_per_call_stdev": round(statistics.stdev(timings), 1) if len(timings) > 1 else 0.0,
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def memory_per_instance(factory, count: int = 10_000) -> float:
+    instances = [None] * count  # allocated before tracing, its pointers are not instance memory
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tracemalloc.start()
+        for index in range(count):
+            instances[index] = factory()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del instances
+    return round(current / count, 1)
+
+
+def build_cases():
+    # (group, variant, kind, case), kind is "call" with case = (statement, namespace) timed by timeit,
+    # or "memory" with case = a callable creating one instance (bytes per instance)
+    ocp = load_example("SOLID Principles with examples/OCP.py", "ocp_example")
+    isp = load_example("SOLID Principles with examples/ISP.py", "isp_example")
+    factory = load_example("Design Patterns/Creational/Factory Pattern/Factory Pattern.py", "factory_example")
+    singleton = load_example("Design Patterns/Creational/Singleton Pattern/Singleton.py", "singleton_example")
+    observer = load_example("Design Patterns/Behavioral/Observer/Observer.py", "observer_example")
+
+    cases = []
+
+    # ABC abstract method dispatch
+    summation = ocp.Summation()
+    calculator = ocp.Calculator(summation)
+    add = lambda num1, num2: num1 + num2
+    namespace = {"ocp": ocp, "factory": factory, "add": add, "summation": summation, "calculator": calculator}
+    cases += [
+        ("abc_dispatch", "plain function", "call", ("add(1, 2)", namespace)),
+        ("abc_dispatch", "Summation.performOperation", "call", ("summation.performOperation(1, 2)", namespace)),
+        ("abc_dispatch", "Calculator(Summation).performOperation", "call", ("calculator.performOperation(1, 2)", namespace)),
+        ("abc_instantiation", "Summation()", "call", ("ocp.Summation()", namespace)),
+        ("abc_instantiation", "LosslessVideoExporter()", "call", ("factory.LosslessVideoExporter()", namespace)),
+        ("abc_instantiation", "EmailNotification()", "call", ("factory.EmailNotification()", namespace)),
+    ]
+
+    # Factories: dict dispatch against direct construction
+    namespace = {"factory": factory, "registry": factory.LazyRegistry(factory.NotificationFactory.factory_mapper),
+                 "master_quality": factory.MasterQualityExporter()}
+    cases += [
+        ("factory", "EmailNotification() direct", "call", ("factory.EmailNotification()", namespace)),
+        ("factory", "NotificationFactory.get_notification", "call", ('factory.NotificationFactory.get_notification("email")', namespace)),
+        ("factory", "LazyRegistry lookup + construct", "call", ('registry["email"]()', namespace)),
+        ("factory", "TransportFactory.create_transport", "call", ('factory.TransportFactory().create_transport("road")', namespace)),
+        ("factory", "MasterQualityExporter.get_video_exporter", "call", ("master_quality.get_video_exporter()", namespace)),
+    ]
+
+    # Singletons: cost of getting the instance after it exists
+    namespace = {"singleton": singleton}
+    cases += [
+        ("singleton", "classic __new__", "call", ("singleton.Singleton_Logger_Traditional()", namespace)),
+        ("singleton", "double-checked lock __new__", "call", ("singleton.Singleton_Logger_Traditional_Threadsafe()", namespace)),
+        ("singleton", "decorator", "call", ('singleton.Singleton_Logger_Decorator("print")', namespace)),
+        ("singleton", "metaclass", "call", ('singleton.Singleton_Logger_Meta_Example("print")', namespace)),
+    ]
+
+    # Observers: @dataclass against a plain class, and notify scaling
+    class SilentObserver(observer.Observer):
+        def update(self, message: str) -> None:
+            pass
+
+    namespace = {"observer": observer, "SilentObserver": SilentObserver}
+    cases += [
+        ("observer_instantiation", "ConcreteObserver (@dataclass)", "call", ('observer.ConcreteObserver("name")', namespace)),
+        ("observer_instantiation", "Subject (@dataclass)", "call", ("observer.Subject()", namespace)),
+        ("observer_instantiation", "plain Observer subclass", "call", ("SilentObserver()", namespace)),
+    ]
+    for observers_count in (1, 10, 100, 1000):
+        subject = observer.Subject()
+        for _ in range(observers_count):
+            subject.attach(SilentObserver())
+        cases.append(("observer_notify_scaling", f"{observers_count} observers", "call", ('subject.notify("value")', {"subject": subject})))
+
+    # Memory per instance
+    cases += [
+        ("memory", "Book", "memory", lambda: isp.Book(1, "Title", 1, 1, 1, "Author", "Publisher", 2000, "Genre", "2025-01-01")),
+        ("memory", "SlottedBook", "memory", lambda: isp.SlottedBook(1, "Title", 1, 1, 1, "Author", "Publisher", 2000, "Genre", "2025-01-01")),
+        ("memory", "Summation", "memory", ocp.Summation),
+        ("memory", "EmailNotification", "memory", factory.EmailNotification),
+        ("memory", "ConcreteObserver (@dataclass)", "memory", lambda: observer.ConcreteObserver("name")),
+        ("memory", "plain Observer subclass", "memory", SilentObserver),
+    ]
+    return cases
+
+
+def run(repeat: int, name_filter: str = "") -> dict:
+    results = []
+    for group, variant, kind, case in build_cases():
+        if name_filter and name_filter.lower() not in f"{group} {variant}".lower():
+            continue
+        result = {"group": group, "variant": variant}
+        try:
+            if kind == "memory":
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    case()  # warm up
+                result["bytes_per_instance"] = memory_per_instance(case)
+            else:
+                statement, namespace = case
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    exec(statement, namespace)  # warm up, also creates the singleton instances so only the lookup is timed
+                result.update(time_case(statement, namespace, repeat))
+        except Exception as error:
+            # an example that is broken is reported, not hidden
+            result["error"] = f"{type(error).__name__}: {error}"
+        results.append(result)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure call, instantiation and memory overhead of the pattern implementations.")
+    parser.add_argument("--repeat", type=int, default=7, help="timing repetitions per case")
+    parser.add_argument("--filter", default="", help="only run cases whose group/variant contains this text")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args.repeat, args.filter), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -59,9 +59,230 @@ def main():
     # subject.detach(observer2)
     # subject.notify("Goodbye, Observers")
 
-main()
-
 
 
 ###############################################################################################################################################################
 
+# Cross process publish/subscribe
+# Subject.notify only reaches observers in the same process. SharedMemorySubject also publishes every value into a ring buffer in shared memory,
+# observers in other processes read it from there:
+# - the payload (bytes or str) is copied into the buffer as raw bytes, nothing is pickled per event. An observer is pickled once, when its process starts
+# - the publisher writes a slot, stamps it with its sequence number and then bumps the write sequence; a subscriber copies the slot and checks
+#   the stamp again afterwards, so it never returns a slot that was overwritten while being read
+# - every subscriber has a cursor in the shared header, publish() waits while the slowest subscriber is a full ring behind, so no event is lost.
+#   A subscriber whose process died is dropped (its cursor cleared) instead of blocking the publisher forever
+# - subscribers poll with a short backoff, no lock or pipe is involved on the hot path
+# Values have to be bytes or str and fit in slot_size bytes, they are checked before any observer is updated.
+# SharedMemorySubject is a Subject, local observers keep working as before (LSP).
+
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+
+_HEADER = struct.Struct("<QQQ")  # write sequence, closed flag, registered subscribers
+_SLOT_HEADER = struct.Struct("<QIB3x")  # sequence, payload length, payload kind (0 bytes, 1 str)
+_MAX_SUBSCRIBERS = 64
+_CURSORS_OFFSET = _HEADER.size
+_SLOTS_OFFSET = _CURSORS_OFFSET + 8 * _MAX_SUBSCRIBERS
+
+
+class SharedMemoryRing:
+    def __init__(self, slots: int = 1024, slot_size: int = 64 * 1024, name: str = None):
+        self.slots = slots
+        self.slot_size = slot_size
+        self.owner = name is None
+        if self.owner:
+            size = _SLOTS_OFFSET + slots * (_SLOT_HEADER.size + slot_size)
+            self._memory = shared_memory.SharedMemory(create=True, size=size)
+            self._memory.buf[:_SLOTS_OFFSET] = bytes(_SLOTS_OFFSET)
+        else:
+            # processes started by multiprocessing share the owner's resource tracker, the owner unlinks the memory in release()
+            self._memory = shared_memory.SharedMemory(name=name)
+        self.name = self._memory.name
+        self._buffer = self._memory.buf
+        self._sequence = _HEADER.unpack_from(self._buffer)[0]
+        self._liveness = {}  # subscriber index -> is_alive callable, only known in the publisher process
+
+    def _slot_offset(self, sequence: int) -> int:
+        return _SLOTS_OFFSET + (sequence % self.slots) * (_SLOT_HEADER.size + self.slot_size)
+
+    def add_subscriber(self) -> int:
+        # Called by the publisher process, the subscriber starts with the next published value
+        write_sequence, closed, subscribers = _HEADER.unpack_from(self._buffer)
+        if subscribers == _MAX_SUBSCRIBERS:
+            raise RuntimeError(f"A ring supports at most {_MAX_SUBSCRIBERS} subscribers")
+        struct.pack_into("<Q", self._buffer, _CURSORS_OFFSET + 8 * subscribers, write_sequence + 1)
+        _HEADER.pack_into(self._buffer, 0, write_sequence, closed, subscribers + 1)
+        return subscribers
+
+    def watch_subscriber(self, index: int, is_alive):
+        # publish() stops waiting for the subscriber once is_alive() returns False, e.g. Process.is_alive of the process reading it
+        self._liveness[index] = is_alive
+
+    def encode(self, value) -> tuple:
+        # Returns (payload, kind) for publish_encoded, raises before anything is written when the value can not be published
+        if isinstance(value, str):
+            payload, kind = value.encode(), 1
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            payload, kind = value, 0
+        else:
+            raise TypeError(f"Only bytes or str can be published, got {type(value).__name__}")
+        if len(payload) > self.slot_size:
+            raise ValueError(f"Payload of {len(payload)} bytes does not fit in a {self.slot_size} bytes slot")
+        return payload, kind
+
+    def publish(self, value):
+        self.publish_encoded(*self.encode(value))
+
+    def publish_encoded(self, payload, kind: int):
+        sequence = self._sequence + 1
+        self._wait_for_subscribers(sequence)
+        offset = self._slot_offset(sequence)
+        _SLOT_HEADER.pack_into(self._buffer, offset, 0, len(payload), kind)  # 0 marks the slot as being written
+        start = offset + _SLOT_HEADER.size
+        self._buffer[start:start + len(payload)] = payload
+        _SLOT_HEADER.pack_into(self._buffer, offset, sequence, len(payload), kind)
+        struct.pack_into("<Q", self._buffer, 0, sequence)
+        self._sequence = sequence
+
+    def _wait_for_subscribers(self, sequence: int):
+        subscribers = _HEADER.unpack_from(self._buffer)[2]
+        if not subscribers:
+            return
+        delay = 0.0
+        while True:
+            cursors = struct.unpack_from(f"<{subscribers}Q", self._buffer, _CURSORS_OFFSET)
+            behind = [index for index, cursor in enumerate(cursors) if cursor and sequence - cursor >= self.slots]
+            if not behind:
+                return
+            for index in behind:
+                is_alive = self._liveness.get(index)
+                if is_alive is not None and not is_alive():
+                    # its process died without clearing the cursor (killed, crashed), it will never catch up
+                    struct.pack_into("<Q", self._buffer, _CURSORS_OFFSET + 8 * index, 0)
+                    del self._liveness[index]
+            time.sleep(delay)
+            delay = min(delay * 2 or 0.00001, 0.001)
+
+    def subscribe(self, index: int):
+        # Yields every published value in order until the ring is closed, then releases the subscriber's cursor
+        cursor_offset = _CURSORS_OFFSET + 8 * index
+        sequence = struct.unpack_from("<Q", self._buffer, cursor_offset)[0]
+        delay = 0.0
+        try:
+            while True:
+                write_sequence, closed, _ = _HEADER.unpack_from(self._buffer)
+                if sequence > write_sequence:
+                    if closed:
+                        return
+                    time.sleep(delay)
+                    delay = min(delay * 2 or 0.00001, 0.001)
+                    continue
+                delay = 0.0
+                offset = self._slot_offset(sequence)
+                stamp, length, kind = _SLOT_HEADER.unpack_from(self._buffer, offset)
+                start = offset + _SLOT_HEADER.size
+                payload = bytes(self._buffer[start:start + length])
+                if stamp != sequence or _SLOT_HEADER.unpack_from(self._buffer, offset)[0] != sequence:
+                    continue  # slot is being rewritten, read it again
+                sequence += 1
+                struct.pack_into("<Q", self._buffer, cursor_offset, sequence)
+                yield payload.decode() if kind == 1 else payload
+        finally:
+            struct.pack_into("<Q", self._buffer, cursor_offset, 0)
+
+    def close(self):
+        if self.owner:
+            write_sequence, _, subscribers = _HEADER.unpack_from(self._buffer)
+            _HEADER.pack_into(self._buffer, 0, write_sequence, 1, subscribers)
+
+    def release(self):
+        self._buffer = None
+        self._memory.close()
+        if self.owner:
+            self._memory.unlink()
+
+
+def _run_remote_observer(name: str, slots: int, slot_size: int, index: int, observer: Observer):
+    ring = SharedMemoryRing(slots, slot_size, name=name)
+    for value in ring.subscribe(index):
+        observer.update(value)
+    finish = getattr(observer, "finish", None)  # optional hook, called once the subject is closed
+    if finish is not None:
+        finish()
+    ring.release()
+
+
+@dataclass
+class SharedMemorySubject(Subject):
+    slots: int = 1024
+    slot_size: int = 64 * 1024
+    processes: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.ring = SharedMemoryRing(self.slots, self.slot_size)
+
+    def attach_process(self, observer: Observer) -> multiprocessing.Process:
+        # Starts a process that calls observer.update for every value notified from now on
+        index = self.ring.add_subscriber()
+        process = multiprocessing.Process(target=_run_remote_observer, args=(self.ring.name, self.slots, self.slot_size, index, observer), daemon=True)
+        process.start()
+        self.ring.watch_subscriber(index, process.is_alive)
+        self.processes.append(process)
+        return process
+
+    def notify(self, value) -> None:
+        encoded = self.ring.encode(value)  # a value the ring can not take fails before local observers see it
+        super().notify(value)
+        self.ring.publish_encoded(*encoded)
+
+    def close(self) -> None:
+        # Lets the subscriber processes read what is left, waits for them and frees the shared memory
+        self.ring.close()
+        for process in self.processes:
+            process.join()
+        self.ring.release()
+
+
+class LatencyObserver(Observer):
+    # Benchmark observer: every payload starts with the monotonic time it was published at (CLOCK_MONOTONIC is shared by all processes)
+    def __init__(self, results):
+        self.results = results
+        self.latencies = []
+
+    def update(self, value) -> None:
+        self.latencies.append(time.monotonic_ns() - struct.unpack_from("<Q", value)[0])
+
+    def finish(self):
+        latencies = sorted(self.latencies)
+        self.results.put((len(latencies), latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]))
+
+
+def main_multiprocess_benchmark(events=50_000, payload_size=4096, subscriber_counts=(1, 2, 4)):
+    padding = bytes(payload_size - 8)
+    for subscribers in subscriber_counts:
+        results = multiprocessing.Queue()
+        subject = SharedMemorySubject(slots=4096, slot_size=payload_size)
+        for _ in range(subscribers):
+            subject.attach_process(LatencyObserver(results))
+        time.sleep(0.2)  # let the processes start
+
+        start = time.perf_counter()
+        for _ in range(events):
+            subject.notify(struct.pack("<Q", time.monotonic_ns()) + padding)
+        elapsed = time.perf_counter() - start
+        subject.ring.close()  # subscribers report once the ring is closed, collect before joining them
+        reports = [results.get() for _ in range(subscribers)]
+        subject.close()
+
+        received = sum(count for count, _, _ in reports)
+        median = max(report[1] for report in reports) / 1000
+        p99 = max(report[2] for report in reports) / 1000
+        print(f"{subscribers} subscribers, {payload_size} B payload: {events / elapsed:,.0f} events/s published, "
+              f"{received:,}/{events * subscribers:,} delivered, latency median {median:.0f} us, p99 {p99:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
+    # main_multiprocess_benchmark()
@@ -257,15 +257,16 @@ class MasterQualityExporter(ExporterFactory):
 def read_factory() -> ExporterFactory:
     """Constructs an exporter factory based on the user's preference."""
 
+    # classes, not instances: only the factory that is picked gets constructed
     factories = {
-        "low": FastExporter(),
-        "high": HighQualityExporter(),
-        "master": MasterQualityExporter(),
+        "low": FastExporter,
+        "high": HighQualityExporter,
+        "master": MasterQualityExporter,
     }
     while True:
         export_quality = input("Enter desired output quality (low, high, master): ")
         if export_quality in factories:
-            return factories[export_quality]
+            return factories[export_quality]()
         print(f"Unknown output quality option: {export_quality}.")
 
 
@@ -323,11 +324,11 @@ class NotificationFactory:
         "push": PushNotification
     }
 
-    @staticmethod
-    def get_notification(channel: str) -> Notification:
+    @classmethod
+    def get_notification(cls, channel: str) -> Notification:
         channel = channel.lower()
         try:
-            return NotificationFactory.factory_mapper[channel]()
+            return cls.factory_mapper[channel]()
         except KeyError:
             raise ValueError(f"Invalid notification channel: {channel}")
 
@@ -345,6 +346,11 @@ class Transport(ABC):
     def deliver(self, package):
         pass
 
+    def deliver_batch(self, packages):
+        # One trip per package by default, transports that can carry many packages per trip override this
+        for package in packages:
+            self.deliver(package)
+
 class RoadWays(Transport):
     def deliver(self, package):
         print(f"delivering {package} by roadways")
@@ -364,4 +370,318 @@ class TransportFactory(ABC):
     
 def main():
     transport_method = input("Enter the transport method (road/sea): ").lower()
-    TransportFactory().create_transport(transport_method).deliver("package")
\ No newline at end of file
+    TransportFactory().create_transport(transport_method).deliver("package")
+
+
+############################################################################################################################################
+
+# Batched delivery scheduler
+# create_transport builds a new RoadWays/SeaWays for every package and deliver handles exactly one package, one trip per package.
+# DeliveryScheduler collects packages per transport method and dispatches a batch when it is full (max_batch_size) or when the oldest package
+# has waited max_wait seconds. Each transport method has its own worker thread and a single transport instance created through the factory
+# and reused for every batch, so road and sea batches go out concurrently.
+# Transports can override deliver_batch when one trip can carry many packages, the default delivers them one by one.
+# A batch whose deliver_batch raises is kept in ModeStats.failed with its error and the worker goes on with the next batch.
+
+import queue
+import threading
+import time
+
+
+class ModeStats:
+    def __init__(self):
+        self.packages = 0
+        self.batches = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.first_dispatch = None
+        self.last_dispatch = None
+        self.failed = []  # (packages, error) of the batches whose delivery raised
+
+    def report(self) -> dict:
+        active = (self.last_dispatch - self.first_dispatch) if self.batches > 1 else 0.0
+        return {
+            "packages": self.packages,
+            "batches": self.batches,
+            "throughput_per_s": self.packages / active if active else None,
+            "mean_queue_latency_ms": self.total_wait / self.packages * 1000 if self.packages else 0.0,
+            "max_queue_latency_ms": self.max_wait * 1000,
+            "failed_batches": len(self.failed),
+            "failed_packages": sum(len(packages) for packages, _ in self.failed),
+        }
+
+
+class DeliveryScheduler:
+    _STOP = object()
+
+    def __init__(self, factory: TransportFactory, max_batch_size: int = 100, max_wait: float = 0.05):
+        self.factory = factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = {}
+        self._queues = {}
+        self._workers = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, package, transport_method: str):
+        transport_method = transport_method.lower()
+        # The put happens under the lock, so no package can end up behind the _STOP sentinel that close() adds
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DeliveryScheduler is closed")
+            packages = self._queues.get(transport_method)
+            if packages is None:
+                packages = self._start_mode(transport_method)
+            packages.put((time.monotonic(), package))
+
+    def _start_mode(self, transport_method):
+        # Called with self._lock held
+        if transport_method not in self.factory.transport_mapper:
+            raise ValueError(f"Invalid transport method: {transport_method}")
+        transport = self.factory.create_transport(transport_method)
+        self.stats[transport_method] = ModeStats()
+        packages = queue.Queue()
+        worker = threading.Thread(target=self._run, args=(transport, packages, self.stats[transport_method]), daemon=True)
+        self._workers[transport_method] = worker
+        self._queues[transport_method] = packages
+        worker.start()
+        return packages
+
+    def _run(self, transport, packages, stats):
+        stopping = False
+        while not stopping:
+            entry = packages.get()
+            if entry is self._STOP:
+                break
+            batch = [entry]
+            deadline = entry[0] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    entry = packages.get(timeout=timeout) if timeout > 0 else packages.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is self._STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            dispatched = time.monotonic()
+            try:
+                transport.deliver_batch([package for _, package in batch])
+            except Exception as error:
+                stats.failed.append(([package for _, package in batch], error))
+                continue
+            stats.packages += len(batch)
+            stats.batches += 1
+            stats.total_wait += sum(dispatched - submitted for submitted, _ in batch)
+            stats.max_wait = max(stats.max_wait, dispatched - batch[0][0])
+            stats.first_dispatch = stats.first_dispatch or dispatched
+            stats.last_dispatch = time.monotonic()
+
+    def close(self):
+        # Dispatches everything already submitted, then stops the workers. submit() raises afterwards
+        with self._lock:
+            self._closed = True
+            for packages in self._queues.values():
+                packages.put(self._STOP)
+            workers = list(self._workers.values())
+        for worker in workers:
+            worker.join()
+
+    def report(self) -> dict:
+        return {transport_method: stats.report() for transport_method, stats in self.stats.items()}
+
+
+# Benchmark transports: every trip has a fixed cost, each package on it a small extra cost
+
+class TimedRoadWays(Transport):
+    trip_time, package_time = 0.005, 0.0001
+
+    def deliver(self, package):
+        self.deliver_batch([package])
+
+    def deliver_batch(self, packages):
+        time.sleep(self.trip_time + self.package_time * len(packages))
+
+class TimedSeaWays(TimedRoadWays):
+    trip_time, package_time = 0.02, 0.00005
+
+class TimedTransportFactory(TransportFactory):
+    transport_mapper = {
+        "road": TimedRoadWays,
+        "sea": TimedSeaWays
+    }
+
+
+def main_delivery_benchmark(packages_count=2_000):
+    methods = ["road", "sea"]
+    factory = TimedTransportFactory()
+
+    start = time.perf_counter()
+    for i in range(packages_count // 10):
+        factory.create_transport(methods[i % 2]).deliver(f"package {i}")
+    elapsed = time.perf_counter() - start
+    print(f"one transport and one trip per package: {packages_count // 10 / elapsed:,.0f} packages/s")
+
+    scheduler = DeliveryScheduler(factory, max_batch_size=200, max_wait=0.05)
+    start = time.perf_counter()
+    for i in range(packages_count):
+        scheduler.submit(f"package {i}", methods[i % 2])
+        if i % 100 == 0:
+            time.sleep(0.001)  # packages arrive over time, not all at once
+    scheduler.close()
+    elapsed = time.perf_counter() - start
+    print(f"batched scheduler: {packages_count / elapsed:,.0f} packages/s")
+    for transport_method, report in scheduler.report().items():
+        print(f"  {transport_method}: {report}")
+
+
+
+############################################################################################################################################
+
+# Lazy plugin registry
+# factory_mapper, transport_mapper and read_factory() need every implementation class imported before the first lookup. When every codec/channel
+# pulls in heavy dependencies, startup pays for all of them even though a run uses only one.
+# LazyRegistry maps a name to either an object or a "module.path:Attribute" string (or an entry point). Strings are imported on first lookup only
+# and the result is cached. It supports the dict operations the factories use (registry[name], name in registry), so it can replace the dicts:
+#
+#     class NotificationFactory:
+#         factory_mapper = LazyRegistry({"email": "notifications.email:EmailNotification", "sms": "notifications.sms:SmsNotification"})
+#
+# Installed packages can also add implementations without touching this code, through entry points:
+#     [project.entry-points."be_pythonic.notifications"]
+#     slack = "my_package.slack:SlackNotification"
+
+import importlib
+
+
+class LazyRegistry:
+    def __init__(self, targets=None):
+        self._targets = {}
+        self._loaded = {}
+        self._lock = threading.Lock()
+        for name, target in (targets or {}).items():
+            self.register(name, target)
+
+    @classmethod
+    def from_entry_points(cls, group: str) -> "LazyRegistry":
+        # Entry points are only listed here, entry_point.load() (the import) happens on first lookup
+        # importlib.metadata is imported here and not at the top, it is not cheap either
+        from importlib import metadata
+
+        return cls({entry_point.name: entry_point for entry_point in metadata.entry_points(group=group)})
+
+    def register(self, name: str, target):
+        # target: the object itself, a "module.path:Attribute" string or an importlib.metadata.EntryPoint
+        if isinstance(target, str) and ":" not in target:
+            raise ValueError(f"Expected 'module.path:Attribute', got {target!r}")
+        name = self._key(name)
+        with self._lock:
+            self._targets[name] = target
+            self._loaded.pop(name, None)
+
+    @staticmethod
+    def _key(name):
+        # Names are case insensitive, every lookup goes through here like register() does
+        return name.lower() if isinstance(name, str) else name
+
+    def __contains__(self, name) -> bool:
+        return self._key(name) in self._targets
+
+    def __iter__(self):
+        return iter(self._targets)
+
+    def __len__(self):
+        return len(self._targets)
+
+    def is_loaded(self, name: str) -> bool:
+        return self._key(name) in self._loaded
+
+    def __getitem__(self, name: str):
+        name = self._key(name)
+        try:
+            return self._loaded[name]
+        except KeyError:
+            pass
+        target = self._targets[name]  # KeyError for unknown names, like a dict
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded[name] = self._resolve(target)
+            return self._loaded[name]
+
+    @staticmethod
+    def _resolve(target):
+        if hasattr(target, "load"):  # importlib.metadata.EntryPoint
+            return target.load()
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(":")
+            obj = importlib.import_module(module_name)
+            for part in attribute.split("."):
+                obj = getattr(obj, part)
+            return obj
+        return target
+
+
+# Import time benchmark
+# Three stand-in channel modules are written to a temporary directory, each importing some heavy standard library modules like a real channel would
+# (an SMTP client, an HTTP client, SSL/asyncio). Both startups run in a fresh interpreter with -X importtime and the self times of every import are summed.
+# Both load this file first (the lazy one uses its LazyRegistry, the eager one a plain dict), so its own imports count on both sides.
+
+_PLUGINS = {
+    "email_channel": "import smtplib, email.mime.multipart, email.mime.text\n",
+    "sms_channel": "import http.client, json, urllib.request\n",
+    "push_channel": "import asyncio, ssl, concurrent.futures\n",
+}
+
+_LOAD_THIS_FILE = """
+import importlib.util
+spec = importlib.util.spec_from_file_location("factory_pattern", path)
+factory_pattern = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(factory_pattern)
+"""
+
+_EAGER_STARTUP = _LOAD_THIS_FILE + """
+from plugins.email_channel import EmailNotification
+from plugins.sms_channel import SmsNotification
+from plugins.push_channel import PushNotification
+mapper = {"email": EmailNotification, "sms": SmsNotification, "push": PushNotification}
+mapper["sms"]().send("john@example.com", "hello")
+"""
+
+_LAZY_STARTUP = _LOAD_THIS_FILE + """
+mapper = factory_pattern.LazyRegistry({"email": "plugins.email_channel:EmailNotification", "sms": "plugins.sms_channel:SmsNotification",
+                       "push": "plugins.push_channel:PushNotification"})
+mapper["sms"]().send("john@example.com", "hello")
+"""
+
+
+def _import_time_us(directory: str, code: str) -> int:
+    # the benchmark's own imports stay inside the functions, importing this file should not pay for them
+    import re
+    import subprocess
+    import sys
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=directory, capture_output=True, text=True, check=True)
+    return sum(int(match) for match in re.findall(r"^import time:\s+(\d+) \|", result.stderr, re.MULTILINE))
+
+
+def main_import_time_benchmark(runs=5):
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "plugins"))
+        open(os.path.join(directory, "plugins", "__init__.py"), "w").close()
+        for module, imports in _PLUGINS.items():
+            channel = module.split("_")[0]
+            class_name = {"email": "EmailNotification", "sms": "SmsNotification", "push": "PushNotification"}[channel]
+            with open(os.path.join(directory, "plugins", f"{module}.py"), "w") as f:
+                f.write(imports)
+                f.write(f"class {class_name}:\n    def send(self, to, message):\n        pass\n")
+
+        for name, startup in (("eager mapper", _EAGER_STARTUP), ("lazy registry", _LAZY_STARTUP)):
+            code = f"path = {os.path.abspath(__file__)!r}\n" + startup
+            timings = sorted(_import_time_us(directory, code) for _ in range(runs))
+            print(f"{name:<14} import time {timings[len(timings) // 2] / 1000:7.1f} ms (median of {runs})")
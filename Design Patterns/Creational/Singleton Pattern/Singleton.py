@@ -1,4 +1,10 @@
+import os
+import queue
+import subprocess
+import sys
 import threading
+import time
+from datetime import datetime
 # 1  with class variable, classic method
 class Singleton_Logger_Traditional:
     _instance = None
@@ -18,8 +24,17 @@ def main_traditional_logger():
 
 
 class Singleton_Logger_Traditional_Threadsafe:
+    # Log rotation: when the file reaches max_bytes or is older than rotate_interval seconds it is renamed to app.log.<timestamp>
+    # and a new app.log is started. Renaming is instant, the rotated file is gzipped in a separate process (python -m gzip) started by a
+    # background thread, so log() never waits on gzip. The process runs at the lowest CPU priority where the OS supports it (os.nice),
+    # on a busy machine logging keeps the CPU and the compression catches up when it is idle.
+    # max_bytes is counted in bytes of UTF-8 encoded text, the file is written in binary mode so the count matches the file size.
+    # Set max_bytes to 0 / rotate_interval to None to turn either rule off.
     _instance = None
     _lock = threading.Lock()  # Ensures thread-safe access
+    max_bytes = 10 * 1024 * 1024
+    rotate_interval = None
+    echo = True  # print every logged message
 
     def __new__(cls):
         if cls._instance is None:
@@ -27,12 +42,63 @@ class Singleton_Logger_Traditional_Threadsafe:
                 if cls._instance is None:  # Double-checked locking
                     cls._instance = super().__new__(cls)
                     cls._instance.log_file = "app.log"
+                    cls._instance._file = None
+                    cls._instance.rotations = 0
+                    cls._instance._write_lock = threading.Lock()
+                    cls._instance._compress_queue = queue.Queue()
+                    threading.Thread(target=cls._instance._compress_rotated, daemon=True).start()
         return cls._instance
 
     def log(self, message):
-        with open(self.log_file, "a") as f:
-            f.write(message + "\n")
-        print(f"Logged: {message}")
+        line = (message + "\n").encode("utf-8")
+        with self._write_lock:
+            if self._file is None:
+                self._open()
+            elif self._should_rotate():
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line)
+        if self.echo:
+            print(f"Logged: {message}")
+
+    def _open(self):
+        self._file = open(self.log_file, "ab")
+        self._size = self._file.tell()
+        self._opened_at = time.time()
+
+    def _should_rotate(self):
+        return (self.max_bytes and self._size >= self.max_bytes) or \
+            (self.rotate_interval is not None and time.time() - self._opened_at >= self.rotate_interval)
+
+    def _rotate(self):
+        self._file.close()
+        rotated = f"{self.log_file}.{datetime.now():%Y%m%d-%H%M%S-%f}"
+        os.replace(self.log_file, rotated)
+        self._open()
+        self.rotations += 1
+        self._compress_queue.put(rotated)
+
+    def _compress_rotated(self):
+        while True:
+            rotated = self._compress_queue.get()
+            try:
+                # python -m gzip writes rotated.gz (compression level 6) and keeps rotated, which is removed once that succeeded
+                subprocess.run([sys.executable, "-m", "gzip", rotated], check=True, capture_output=True,
+                               preexec_fn=(lambda: os.nice(19)) if hasattr(os, "nice") else None)
+                os.remove(rotated)
+            except (OSError, subprocess.CalledProcessError) as error:
+                print(f"Could not compress {rotated}: {error}")
+            finally:
+                self._compress_queue.task_done()
+
+    def close(self):
+        # Closes the current file and waits for the rotated files to be compressed
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._compress_queue.join()
 
 def main_traditional_logger_threadsafe():
     logger1 = Singleton_Logger_Traditional_Threadsafe()
@@ -44,6 +110,36 @@ def main_traditional_logger_threadsafe():
     logger2.log("Application running")
 
 
+def main_rotation_benchmark(messages=500_000, window=10_000, max_bytes=2 * 1024 * 1024):
+    # Logs in windows of `window` messages and reports the throughput of every window, the windows where a rotation happened
+    # should be as fast as the others because the compression runs in a low priority process, the difference is printed as the dip
+    import statistics
+    import tempfile
+
+    logger = Singleton_Logger_Traditional_Threadsafe()
+    logger.close()
+    with tempfile.TemporaryDirectory() as directory:
+        logger.log_file = os.path.join(directory, "app.log")
+        logger.max_bytes, logger.echo = max_bytes, False
+        message = "x" * 100
+        rotating, steady = [], []
+        for _ in range(messages // window):
+            rotations_before = logger.rotations
+            start = time.perf_counter()
+            for _ in range(window):
+                logger.log(message)
+            rate = window / (time.perf_counter() - start)
+            (rotating if logger.rotations != rotations_before else steady).append(rate)
+        logger.close()
+        files = sorted(os.listdir(directory))
+        print(f"windows with a rotation:    median {statistics.median(rotating):,.0f} msg/s, min {min(rotating):,.0f} msg/s ({len(rotating)} windows)")
+        print(f"windows without a rotation: median {statistics.median(steady):,.0f} msg/s, min {min(steady):,.0f} msg/s ({len(steady)} windows)")
+        dip = 1 - statistics.median(rotating) / statistics.median(steady)
+        print(f"throughput dip in rotation windows: {dip:.1%} (median against median)")
+        print(f"{len(files)} files, {sum(name.endswith('.gz') for name in files)} compressed")
+    logger.log_file, logger.max_bytes, logger.echo = "app.log", Singleton_Logger_Traditional_Threadsafe.max_bytes, True
+
+
 ############################################ 2 with decorator ###############################################
 
 def singleton_decorator(cls): # this decorator ensures that only one instance of the class is created
@@ -83,7 +179,7 @@ class Singleton_Logger_Meta(type): # (type) -> type is a default metaclass in Py
         print(f"Metaclass __call__ method called {cls.__name__}")
         if cls not in cls._instances:
             print(f"Creating a new instance of {cls.__name__} from metaclass __call__")
-            instance = super().__call__(cls, *args, **kwargs)
+            instance = super().__call__(*args, **kwargs)
             cls._instances[cls] = instance
         else:
             print(f"Returning existing instance of {cls.__name__} from metaclass __call__")
@@ -108,5 +204,6 @@ def main_meta_logger():
 if __name__ == "__main__":
     # main_traditional_logger()
     # main_traditional_logger_threadsafe()
+    # main_rotation_benchmark()
     # main_decorator_logger()
     main_meta_logger()
\ No newline at end of file
@@ -61,3 +61,179 @@ class AccountOperations:  # High-level module
         # Deposit logic
         self.logger.log(f"Deposited {amount}")
         self.email_service.send_email(f"Deposited {amount}")
+
+
+
+###############################################################################################################################################################
+
+# Outbox for side effects
+# AccountOperations.deposit calls logger.log and email_service.send_email inline, so every deposit waits for the slowest of them.
+# With an outbox the deposit only records "these side effects have to happen" and returns. An OutboxDispatcher delivers them in the background:
+# it takes up to batch_size messages at a time, calls the services, and a message leaves the outbox only once the call succeeded.
+# A failing call is put back and retried later with a growing delay, after max_attempts it goes to dead_letters and is not retried again.
+# Delivery guarantee: retried while the process lives. The outbox is in memory, messages still in it when the process exits are lost,
+# and dead letters are only reported, never delivered. Surviving a restart needs the outbox to be stored with the deposit itself
+# (the same database transaction), which this example does not have.
+# A message can be delivered twice (for example the service did its job but raised afterwards), so services should tolerate that.
+# The high-level module still only depends on LoggerInterface and EmailServiceInterface, the outbox is just another detail behind them (DIP).
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+
+
+class Outbox:
+    def __init__(self):
+        self._ready = deque()  # (attempts, action, message), deliverable now
+        self._delayed = []  # heap of (not_before, tie breaker, attempts, action, message) waiting for a retry
+        self._counter = itertools.count()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._ready) + len(self._delayed) + self._in_flight
+
+    def record(self, action, message, attempts=0, not_before=0.0):
+        with self._condition:
+            if not_before > time.monotonic():
+                heapq.heappush(self._delayed, (not_before, next(self._counter), attempts, action, message))
+            else:
+                self._ready.append((attempts, action, message))
+            self._condition.notify()
+
+    def take(self, batch_size, timeout):
+        # Waits for messages that are ready to be delivered and marks them in flight until ack() is called for them
+        # Retries whose delay is over move from the heap to the ready queue, messages still backing off are not looked at
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    _, _, attempts, action, message = heapq.heappop(self._delayed)
+                    self._ready.append((attempts, action, message))
+                batch = [self._ready.popleft() for _ in range(min(batch_size, len(self._ready)))]
+                if batch or now >= deadline:
+                    self._in_flight += len(batch)
+                    return batch
+                wake_up = min(deadline, self._delayed[0][0]) if self._delayed else deadline
+                self._condition.wait(wake_up - now)
+
+    def ack(self, count=1):
+        with self._condition:
+            self._in_flight -= count
+            self._condition.notify_all()
+
+    def wait_until_empty(self, timeout=None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._ready and not self._delayed and not self._in_flight, timeout)
+
+
+class OutboxDispatcher:
+    def __init__(self, outbox: Outbox, workers=4, batch_size=100, max_attempts=5, retry_delay=0.05):
+        self.outbox = outbox
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.delivered = 0
+        self.retried = 0
+        self.dead_letters = []
+        self._stats_lock = threading.Lock()
+        self._running = True
+        self._workers = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def _run(self):
+        while self._running:
+            for attempts, action, message in self.outbox.take(self.batch_size, timeout=0.1):
+                try:
+                    action(message)
+                except Exception as error:
+                    attempts += 1
+                    if attempts >= self.max_attempts:
+                        with self._stats_lock:
+                            self.dead_letters.append((action, message, error))
+                    else:
+                        with self._stats_lock:
+                            self.retried += 1
+                        self.outbox.record(action, message, attempts, time.monotonic() + self.retry_delay * 2 ** (attempts - 1))
+                else:
+                    with self._stats_lock:
+                        self.delivered += 1
+                self.outbox.ack()
+
+    def stop(self, timeout=None) -> bool:
+        # Delivers what is already in the outbox, then stops the workers
+        # Returns False when the timeout ran out first, the messages left in the outbox (len(outbox)) were not delivered
+        drained = self.outbox.wait_until_empty(timeout)
+        self._running = False
+        for worker in self._workers:
+            worker.join()
+        return drained
+
+
+class OutboxAccountOperations(AccountOperations):
+    def __init__(self, logger: LoggerInterface, email_service: EmailServiceInterface, outbox: Outbox):
+        super().__init__(logger, email_service)
+        self.outbox = outbox
+
+    def deposit(self, amount):
+        # Deposit logic
+        self.outbox.record(self.logger.log, f"Deposited {amount}")
+        self.outbox.record(self.email_service.send_email, f"Deposited {amount}")
+
+
+class SlowLogger(LoggerInterface):
+    def __init__(self, latency=0.005):
+        self.latency = latency
+        self.messages = []
+
+    def log(self, message):
+        time.sleep(self.latency)
+        self.messages.append(message)
+
+
+class SlowEmailService(EmailServiceInterface):
+    # Fails failure_rate of the calls to exercise the retries
+    def __init__(self, latency=0.02, failure_rate=0.1):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sent = []
+
+    def send_email(self, message):
+        time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise ConnectionError("SMTP server unavailable")
+        self.sent.append(message)
+
+
+def main_outbox_benchmark(deposits=200):
+    logger, email_service = SlowLogger(), SlowEmailService(failure_rate=0)
+    operations = AccountOperations(logger, email_service)
+    start = time.perf_counter()
+    for amount in range(deposits):
+        operations.deposit(amount)
+    print(f"inline side effects: {(time.perf_counter() - start) / deposits * 1000:.3f} ms/deposit")
+
+    logger, email_service = SlowLogger(), SlowEmailService(failure_rate=0.1)
+    outbox = Outbox()
+    dispatcher = OutboxDispatcher(outbox, workers=8)
+    operations = OutboxAccountOperations(logger, email_service, outbox)
+    start = time.perf_counter()
+    for amount in range(deposits):
+        operations.deposit(amount)
+    print(f"outbox: {(time.perf_counter() - start) / deposits * 1000:.3f} ms/deposit")
+
+    start = time.perf_counter()
+    drained = dispatcher.stop(timeout=60)
+    expected = {f"Deposited {amount}" for amount in range(deposits)}
+    print(f"outbox drained={drained} in {time.perf_counter() - start:.2f}s, {dispatcher.retried} retries, {len(dispatcher.dead_letters)} dead letters, "
+          f"all logged={set(logger.messages) == expected}, all emailed={set(email_service.sent) == expected}")
+
+
+if __name__ == "__main__":
+    main_outbox_benchmark()
@@ -97,6 +97,7 @@ class ILibraryItem(ABC):
     return_due_date: str
     booking_name: str
     booking_id: int
+    __slots__ = ()  # lets subclasses opt into __slots__, see SlottedBook below
 
     @abstractmethod
     def get_booking_details(self):
@@ -164,4 +165,573 @@ class SeatReservation(ILibraryItem):
         return self.return_due_date
     
     def reserve(self):
-        print(f"Seat {self.seat_number} reserved for {self.booking_name}.")
\ No newline at end of file
+        print(f"Seat {self.seat_number} reserved for {self.booking_name}.")
+
+###############################################################################################################################################################
+
+# Compact Book records
+# Every Book above keeps its ten attributes in a per-instance __dict__. With millions of books in memory that dict is most of the cost of a Book.
+# Two ways to make it smaller while keeping the same Book API (get_booking_details, get_due_date, check_out, return_item):
+# 1. __slots__ -> attributes are stored in fixed slots on the instance, no __dict__ is created at all
+# 2. Struct of arrays (columnar store) -> one array/list per attribute, and a BookView is just a (store, index) pair pointing into those columns.
+#    Integer columns live in array('q') so each value costs 8 bytes instead of a full int object.
+# Note: for __slots__ to actually remove the __dict__ every class in the hierarchy has to declare __slots__, that is why ILibraryItem declares an empty one.
+
+import sys
+import time
+import tracemalloc
+from array import array
+
+
+class SlottedBook(ILibraryItem):
+    __slots__ = ("library_id", "title", "total_copies", "available_copies", "pages",
+                 "author", "publisher", "publication_year", "genre", "return_due_date")
+
+    def __init__(self, library_id, title, total_copies, available_copies, pages, author, publisher, publication_year, genre, return_due_date):
+        self.return_due_date = return_due_date
+        self.library_id = library_id
+        self.title = title
+        self.total_copies = total_copies
+        self.available_copies = available_copies
+        self.pages = pages
+        self.author = author
+        self.publisher = publisher
+        self.publication_year = publication_year
+        self.genre = genre
+
+    def get_booking_details(self):
+        return f"Book: {self.title}, Author: {self.author}, Available Copies: {self.available_copies}"
+
+    def get_due_date(self):
+        return self.return_due_date
+
+    def check_out(self):
+        if self.available_copies > 0:
+            self.available_copies -= 1
+            return True
+        return False
+
+    def return_item(self):
+        if self.available_copies < self.total_copies:
+            self.available_copies += 1
+            return True
+        return False
+
+
+class BookStore:
+    # Columnar storage for books, one column per attribute
+    # Repeated strings (author, publisher, genre, due date) are interned so the same value is shared between rows
+    _int_columns = ("library_id", "total_copies", "available_copies", "pages", "publication_year")
+    _str_columns = ("title", "author", "publisher", "genre", "return_due_date")
+
+    def __init__(self):
+        for name in self._int_columns:
+            setattr(self, name, array("q"))
+        for name in self._str_columns:
+            setattr(self, name, [])
+
+    def __len__(self):
+        return len(self.library_id)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError("book index out of range")
+        return BookView(self, index % len(self))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield BookView(self, index)
+
+    def add(self, library_id, title, total_copies, available_copies, pages, author, publisher, publication_year, genre, return_due_date):
+        self.library_id.append(library_id)
+        self.total_copies.append(total_copies)
+        self.available_copies.append(available_copies)
+        self.pages.append(pages)
+        self.publication_year.append(publication_year)
+        self.title.append(title)
+        self.author.append(sys.intern(author))
+        self.publisher.append(sys.intern(publisher))
+        self.genre.append(sys.intern(genre))
+        self.return_due_date.append(sys.intern(return_due_date))
+        return BookView(self, len(self) - 1)
+
+
+def _column(name):
+    # Property that reads/writes one cell of the store column for this view
+    def getter(view):
+        return getattr(view._store, name)[view._index]
+
+    def setter(view, value):
+        getattr(view._store, name)[view._index] = value
+
+    return property(getter, setter)
+
+
+class BookView(ILibraryItem):
+    # Lightweight handle to one row of a BookStore, behaves like a Book
+    # Views are created on demand so they cost nothing while the book is only sitting in the store
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: BookStore, index: int):
+        self._store = store
+        self._index = index
+
+    library_id = _column("library_id")
+    title = _column("title")
+    total_copies = _column("total_copies")
+    available_copies = _column("available_copies")
+    pages = _column("pages")
+    author = _column("author")
+    publisher = _column("publisher")
+    publication_year = _column("publication_year")
+    genre = _column("genre")
+    return_due_date = _column("return_due_date")
+
+    def get_booking_details(self):
+        return f"Book: {self.title}, Author: {self.author}, Available Copies: {self.available_copies}"
+
+    def get_due_date(self):
+        return self.return_due_date
+
+    def check_out(self):
+        column = self._store.available_copies
+        if column[self._index] > 0:
+            column[self._index] -= 1
+            return True
+        return False
+
+    def return_item(self):
+        column = self._store.available_copies
+        if column[self._index] < self._store.total_copies[self._index]:
+            column[self._index] += 1
+            return True
+        return False
+
+
+def _book_rows(count):
+    # Authors, publishers, genres and due dates repeat a lot in a real catalogue, so the rows share those strings
+    authors = [f"Author {i}" for i in range(1000)]
+    publishers = [f"Publisher {i}" for i in range(50)]
+    genres = [f"Genre {i}" for i in range(20)]
+    due_dates = [f"2025-01-{day:02d}" for day in range(1, 29)]
+    for i in range(count):
+        yield (i, f"Title {i}", 5, 5, 300, authors[i % 1000], publishers[i % 50], 1950 + i % 70, genres[i % 20], due_dates[i % 28])
+
+
+def main_memory_benchmark(count=100_000):
+    # Reports bytes per book for each layout, measured with tracemalloc
+    # Rows are generated the same way for every layout (unique title, shared repeated strings), so the difference is the per-record overhead
+    layouts = {
+        "dict (Book)": lambda: [Book(*row) for row in _book_rows(count)],
+        "__slots__ (SlottedBook)": lambda: [SlottedBook(*row) for row in _book_rows(count)],
+    }
+
+    def columnar():
+        store = BookStore()
+        for row in _book_rows(count):
+            store.add(*row)
+        return store
+
+    layouts["columnar (BookStore)"] = columnar
+
+    for name, build in layouts.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        books = build()
+        elapsed = time.perf_counter() - start
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:<25} {current / count:8.1f} bytes/book   build {elapsed:.2f}s")
+        del books
+
+
+
+###############################################################################################################################################################
+
+# Thread-safe inventory counters
+# check_out/return_item do read -> check -> modify on available_copies. Two threads can both see available_copies == 1 and both check the book out.
+# One global lock fixes that but every checkout in the library then waits on every other checkout, even for unrelated books.
+# Lock striping: keep a fixed pool of locks and pick one by hashing the library_id. Books on different stripes never wait on each other,
+# and the number of locks stays constant no matter how many books there are (a lock per book would cost memory for millions of books).
+# The Book classes above stay as they are, Inventory only wraps their calls, so it works with Book, SlottedBook and BookView alike.
+
+import random
+import threading
+
+
+class Inventory:
+    def __init__(self, stripes: int = 64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _lock_for(self, item: ILibraryItem) -> threading.Lock:
+        return self._locks[hash(item.library_id) % len(self._locks)]
+
+    def check_out(self, item: ILibraryItem) -> bool:
+        with self._lock_for(item):
+            return item.check_out()
+
+    def return_item(self, item: ILibraryItem) -> bool:
+        with self._lock_for(item):
+            return item.return_item()
+
+
+class _PersistedBook(SlottedBook):
+    # Benchmark only: a book whose check_out/return_item also write the change somewhere (a database, a file),
+    # simulated with a sleep. Like real I/O the sleep releases the GIL while the stripe lock is held.
+    __slots__ = ()
+    io_time = 0.0001
+
+    def check_out(self):
+        time.sleep(self.io_time)
+        return super().check_out()
+
+    def return_item(self):
+        time.sleep(self.io_time)
+        return super().return_item()
+
+
+def main_inventory_benchmark(books_count=1_000, operations_per_thread=20_000, thread_counts=(1, 2, 4, 8)):
+    # Every thread randomly checks out and returns books. Afterwards for every book:
+    # total_copies - available_copies must equal successful checkouts - successful returns, and stay within [0, total_copies]
+    # On CPython only one thread runs Python code at a time (GIL), so with in-memory books ops/s cannot grow with the thread count,
+    # whatever the locking, the "in-memory" rows only show that striping costs nothing and stays correct.
+    # Scaling shows where the critical section waits on I/O: with _PersistedBook a single lock serializes every write,
+    # 64 stripes let the writes of different books overlap.
+    for book_class, operations in ((SlottedBook, operations_per_thread), (_PersistedBook, operations_per_thread // 20)):
+        for stripes in (1, 64):
+            for threads_count in thread_counts:
+                _run_inventory_benchmark(book_class, books_count, operations, stripes, threads_count)
+
+
+def _run_inventory_benchmark(book_class, books_count, operations_per_thread, stripes, threads_count):
+    books = [book_class(i, f"Title {i}", 3, 3, 300, "Author", "Publisher", 2000, "Genre", "2025-01-01") for i in range(books_count)]
+    inventory = Inventory(stripes)
+    net_checkouts = [[0] * books_count for _ in range(threads_count)]
+
+    def worker(counts, seed):
+        rng = random.Random(seed)
+        for _ in range(operations_per_thread):
+            index = rng.randrange(books_count)
+            if rng.random() < 0.5:
+                if inventory.check_out(books[index]):
+                    counts[index] += 1
+            elif inventory.return_item(books[index]):
+                counts[index] -= 1
+
+    workers = [threading.Thread(target=worker, args=(net_checkouts[i], i)) for i in range(threads_count)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    correct = all(
+        0 <= book.available_copies <= book.total_copies
+        and book.total_copies - book.available_copies == sum(counts[i] for counts in net_checkouts)
+        for i, book in enumerate(books)
+    )
+    ops_per_second = threads_count * operations_per_thread / elapsed
+    kind = "in-memory" if book_class is SlottedBook else "with I/O"
+    print(f"{kind:<9} stripes={stripes:<3} threads={threads_count:<2} {ops_per_second:12,.0f} ops/s   correct={correct}")
+
+
+
+###############################################################################################################################################################
+
+# Seat reservation engine
+# SeatReservation above only records a booking, nothing stops two people from booking the same seat for the same time.
+# ReservationEngine keeps the bookings of every seat in a sorted index (two parallel sorted lists of start and end times).
+# Bookings of one seat never overlap, so sorting by start also sorts by end, and a single bisect answers "is the seat free between t1 and t2":
+# the booking just before t2 must end at or before t1.
+# Seats are grouped by (floor, zone) so "find N free seats" only looks at the seats in that area: it checks the seats of the area one by one,
+# O(log bookings) each, and stops at the N-th free one. So it is linear in the seats of the area (tens to hundreds), not in the bookings.
+# Times can be anything comparable (datetime, timestamps), as long as one engine uses one kind.
+
+import itertools
+from bisect import bisect_left
+
+
+class SeatSchedule:
+    __slots__ = ("seat_number", "floor", "zone", "starts", "ends", "booking_ids", "lock")
+
+    def __init__(self, seat_number, floor, zone):
+        self.seat_number = seat_number
+        self.floor = floor
+        self.zone = zone
+        self.starts = []
+        self.ends = []
+        self.booking_ids = []
+        self.lock = threading.Lock()
+
+    def is_free(self, start, end) -> bool:
+        # index of the first booking starting at or after end, the one before it is the last booking that could overlap
+        index = bisect_left(self.starts, end)
+        return index == 0 or self.ends[index - 1] <= start
+
+    def add(self, start, end, booking_id):
+        index = bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.booking_ids.insert(index, booking_id)
+
+    def remove(self, start, booking_id):
+        # bookings do not overlap, so no two bookings of a seat start at the same time
+        index = bisect_left(self.starts, start)
+        if index == len(self.starts) or self.booking_ids[index] != booking_id:
+            raise KeyError(f"No booking {booking_id} starting at {start} on seat {self.seat_number}")
+        del self.starts[index], self.ends[index], self.booking_ids[index]
+
+
+class ReservationEngine:
+    _PENDING = object()  # booking id taken by a reserve() that has not finished yet
+
+    def __init__(self):
+        self._seats = {}
+        self._areas = {}
+        self._bookings = {}
+        self._bookings_lock = threading.Lock()
+
+    def add_seat(self, seat_number, floor, zone):
+        schedule = SeatSchedule(seat_number, floor, zone)
+        self._seats[seat_number] = schedule
+        self._areas.setdefault((floor, zone), []).append(schedule)
+
+    def is_free(self, seat_number, start, end) -> bool:
+        schedule = self._seats[seat_number]
+        with schedule.lock:
+            return schedule.is_free(start, end)
+
+    def reserve(self, reservation: SeatReservation, start, end) -> bool:
+        if not start < end:
+            raise ValueError("Reservation must end after it starts.")
+        schedule = self._seats[reservation.seat_number]
+        if (reservation.floor, reservation.zone) != (schedule.floor, schedule.zone):
+            raise ValueError(f"Seat {schedule.seat_number} is on floor {schedule.floor}, zone {schedule.zone}, "
+                             f"not on floor {reservation.floor}, zone {reservation.zone}.")
+        booking_id = reservation.booking_id
+        with self._bookings_lock:
+            if booking_id in self._bookings:
+                raise ValueError(f"Booking id {booking_id} is already used.")
+            self._bookings[booking_id] = self._PENDING
+        with schedule.lock:
+            reserved = schedule.is_free(start, end)
+            if reserved:
+                schedule.add(start, end, booking_id)
+        with self._bookings_lock:
+            if reserved:
+                self._bookings[booking_id] = (schedule, start)
+            else:
+                del self._bookings[booking_id]
+        return reserved
+
+    def cancel(self, booking_id) -> bool:
+        with self._bookings_lock:
+            booking = self._bookings.get(booking_id)
+            if booking is None or booking is self._PENDING:
+                return False
+            del self._bookings[booking_id]
+        schedule, start = booking
+        with schedule.lock:
+            schedule.remove(start, booking_id)
+        return True
+
+    def find_free_seats(self, floor, zone, start, end, count=1) -> list:
+        # Only a snapshot, another thread can take a seat before it is reserved, reserve() tells if that happened
+        free_seats = []
+        for schedule in self._areas.get((floor, zone), ()):
+            with schedule.lock:
+                if schedule.is_free(start, end):
+                    free_seats.append(schedule.seat_number)
+            if len(free_seats) == count:
+                break
+        return free_seats
+
+
+def main_reservation_benchmark(floors=5, zones=4, seats_per_zone=50, bookings_per_thread=20_000, threads_count=8):
+    engine = ReservationEngine()
+    for floor in range(floors):
+        for zone in range(zones):
+            for seat in range(seats_per_zone):
+                engine.add_seat(f"F{floor}-Z{zone}-S{seat}", floor, f"Z{zone}")
+
+    booking_ids = itertools.count()
+    accepted = [0] * threads_count
+
+    def worker(thread_index):
+        rng = random.Random(thread_index)
+        for _ in range(bookings_per_thread):
+            floor = rng.randrange(floors)
+            zone = f"Z{rng.randrange(zones)}"
+            start = rng.randrange(0, 24 * 365) * 3600
+            end = start + rng.randrange(1, 9) * 3600
+            for seat_number in engine.find_free_seats(floor, zone, start, end, count=1):
+                reservation = SeatReservation(1, seat_number, floor, zone, end, f"User {thread_index}", next(booking_ids))
+                if engine.reserve(reservation, start, end):
+                    accepted[thread_index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    no_overlaps = all(
+        all(schedule.ends[i] <= schedule.starts[i + 1] for i in range(len(schedule.starts) - 1))
+        for schedule in engine._seats.values()
+    )
+    requests = threads_count * bookings_per_thread
+    print(f"{requests:,} booking requests, {sum(accepted):,} accepted in {elapsed:.2f}s ({requests / elapsed:,.0f} req/s), no overlaps={no_overlaps}")
+
+    # Contended: every thread books the same few seats for overlapping slots in the same week, most requests must be refused
+    hot_seats = [f"F0-Z0-S{seat}" for seat in range(3)]
+    accepted = [0] * threads_count
+    before = sum(len(engine._seats[seat_number].starts) for seat_number in hot_seats)
+
+    def contended_worker(thread_index):
+        rng = random.Random(1_000 + thread_index)
+        for _ in range(bookings_per_thread // 10):
+            start = (24 * 365 + rng.randrange(0, 24 * 7)) * 3600
+            end = start + rng.randrange(1, 9) * 3600
+            reservation = SeatReservation(1, rng.choice(hot_seats), 0, "Z0", end, f"User {thread_index}", next(booking_ids))
+            if engine.reserve(reservation, start, end):
+                accepted[thread_index] += 1
+
+    workers = [threading.Thread(target=contended_worker, args=(i,)) for i in range(threads_count)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    stored = sum(len(engine._seats[seat_number].starts) for seat_number in hot_seats) - before
+    no_overlaps = all(
+        all(schedule.ends[i] <= schedule.starts[i + 1] for i in range(len(schedule.starts) - 1))
+        for schedule in (engine._seats[seat_number] for seat_number in hot_seats)
+    )
+    requests = threads_count * (bookings_per_thread // 10)
+    print(f"contended: {requests:,} requests on {len(hot_seats)} seats, {sum(accepted):,} accepted, {stored:,} stored, no overlaps={no_overlaps}")
+
+    lookups = 100_000
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(lookups):
+        seat_start = rng.randrange(0, 24 * 365) * 3600
+        engine.is_free(f"F{rng.randrange(floors)}-Z{rng.randrange(zones)}-S{rng.randrange(seats_per_zone)}", seat_start, seat_start + 3600)
+    elapsed = time.perf_counter() - start
+    print(f"{lookups:,} is_free lookups in {elapsed:.2f}s ({lookups / elapsed:,.0f} lookups/s)")
+
+
+
+###############################################################################################################################################################
+
+# Due date expiry scheduler
+# Both Book and SeatReservation expose get_due_date() as a string, finding overdue items means parsing and checking every outstanding item.
+# DueDateScheduler keeps outstanding items in a min-heap keyed by the parsed due timestamp, so the next item to expire is always on top:
+# adding is O(log n) and popping every overdue item is O(log n) per item, items that are not due yet are never looked at.
+# Returned items are not searched for inside the heap (that would be O(n)), their heap entry is only marked as removed (lazy deletion)
+# Entries are keyed by what identifies the loan (booking_id of a reservation, type and library_id otherwise), not by id(item):
+# a BookStore hands out a new BookView on every access, remove(store[0]) has to find the entry added for an earlier view of the same row.
+# and skipped when it reaches the top. When more than half of the heap is removed entries, it is rebuilt without them.
+# Due dates repeat a lot (everyone borrowing on the same day gets the same due date), so parsing is cached per distinct string.
+
+import heapq
+from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def parse_due_date(due_date: str) -> float:
+    return datetime.fromisoformat(due_date).timestamp()
+
+
+class DueDateScheduler:
+    _REMOVED = object()
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()  # tie breaker, items themselves are not comparable
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _key(item: ILibraryItem):
+        booking_id = getattr(item, "booking_id", None)
+        if booking_id is not None:
+            return ("booking", booking_id)
+        return (type(item).__name__, item.library_id)
+
+    def add(self, item: ILibraryItem):
+        key = self._key(item)
+        if key in self._entries:
+            self.remove(item)
+        entry = [parse_due_date(item.get_due_date()), next(self._counter), item, key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, item: ILibraryItem) -> bool:
+        entry = self._entries.pop(self._key(item), None)
+        if entry is None:
+            return False
+        entry[2] = self._REMOVED
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [entry for entry in self._heap if entry[2] is not self._REMOVED]
+            heapq.heapify(self._heap)
+        return True
+
+    def next_due(self):
+        while self._heap and self._heap[0][2] is self._REMOVED:
+            heapq.heappop(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def pop_overdue(self, now: float = None) -> list:
+        now = time.time() if now is None else now
+        overdue = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, _, item, key = heapq.heappop(heap)
+            if item is not self._REMOVED:
+                del self._entries[key]
+                overdue.append(item)
+        return overdue
+
+
+def main_due_date_benchmark(loans=1_000_000):
+    due_dates = [f"2025-{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 29)]
+    books = [SlottedBook(i, "Title", 1, 0, 300, "Author", "Publisher", 2000, "Genre", due_dates[i % len(due_dates)]) for i in range(loans)]
+    scheduler = DueDateScheduler()
+
+    start = time.perf_counter()
+    for book in books:
+        scheduler.add(book)
+    elapsed = time.perf_counter() - start
+    print(f"add {loans:,} loans: {elapsed:.2f}s ({loans / elapsed:,.0f}/s)")
+
+    start = time.perf_counter()
+    for book in books[::2]:
+        scheduler.remove(book)
+    elapsed = time.perf_counter() - start
+    print(f"return {loans // 2:,} loans: {elapsed:.2f}s ({loans // 2 / elapsed:,.0f}/s)")
+
+    # A daily overdue check for the first quarter: the heap only touches items that became due, a scan looks at every outstanding loan every day
+    days = [parse_due_date(f"2025-{month:02d}-{day:02d}") for month in range(1, 4) for day in range(1, 29)]
+    start = time.perf_counter()
+    overdue = sum(len(scheduler.pop_overdue(now)) for now in days)
+    elapsed = time.perf_counter() - start
+    print(f"{len(days)} daily checks with heap: {elapsed:.2f}s, {overdue:,} overdue, {len(scheduler):,} still outstanding")
+
+    outstanding = books[1::2]
+    start = time.perf_counter()
+    for now in days:
+        overdue = [book for book in outstanding if parse_due_date(book.get_due_date()) <= now]
+        outstanding = [book for book in outstanding if parse_due_date(book.get_due_date()) > now]
+    elapsed = time.perf_counter() - start
+    print(f"{len(days)} daily checks with full scan: {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    main_memory_benchmark()
+    # main_inventory_benchmark()
+    # main_reservation_benchmark()
+    # main_due_date_benchmark()
@@ -121,4 +121,621 @@ def main():
     if isinstance(postgres_db, ICachable):
         postgres_db.caching()
 
-main()
\ No newline at end of file
+
+###############################################################################################################################################################
+
+# Connection pool
+# DatabaseService above calls connect() and disconnect() around every unit of work, so every operation pays the full connection setup.
+# A pool keeps connected databases around and leases them out: a connection is created only when no idle one is available,
+# and given back to the pool instead of being disconnected.
+# min_size -> connections that are kept even when idle, max_size -> hard limit, callers wait (up to lease_timeout) when all are leased
+# idle_timeout -> idle connections above min_size older than this are disconnected, by a background evictor that checks every idle_timeout / 2
+#                 and on every release(), so connections left over from a burst of traffic are closed even when no one calls the pool anymore
+# release() only accepts connections that are currently leased from this pool, releasing one twice raises ValueError
+# health_check -> called before a connection is leased out, broken connections (check returns False or raises) are dropped and replaced
+# Whenever connections are dropped the pool connects new ones again until it is back at min_size.
+# The pool only relies on connect()/disconnect(), so any BaseDatabase (MySQL, PostgreSQL, a fake one) can be pooled. It is substitutable (LSP).
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+class ConnectionPool:
+    def __init__(self, factory: Callable[[], BaseDatabase], min_size: int = 1, max_size: int = 10, lease_timeout: float = 5.0,
+                 idle_timeout: float = 60.0, health_check: Optional[Callable[[BaseDatabase], bool]] = None):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Pool size must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.lease_timeout = lease_timeout
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self._idle = deque()  # (database, time it was returned), most recently used on the right
+        self._leased = set()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+        self._stop_evictor = threading.Event()
+        self._evictor = threading.Thread(target=self._evict_periodically, daemon=True)
+        self._evictor.start()
+
+    def _evict_periodically(self):
+        while not self._stop_evictor.wait(self.idle_timeout / 2):
+            self.evict_idle()
+
+    def _connect(self) -> BaseDatabase:
+        database = self.factory()
+        database.connect()
+        return database
+
+    def _discard(self, database: BaseDatabase):
+        try:
+            database.disconnect()
+        except Exception:
+            pass  # the connection is thrown away anyway, a broken one may not disconnect cleanly
+        finally:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> BaseDatabase:
+        timeout = self.lease_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    if self._idle:
+                        database, _ = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # reserve the slot now, connect outside of the lock so other callers are not blocked by a slow connect
+                        self._size += 1
+                        database = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No database connection available within {timeout}s")
+                    self._condition.wait(remaining)
+
+            if database is None:
+                try:
+                    database = self._connect()
+                except BaseException:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                return self._lease_out(database)
+            if self._is_healthy(database):
+                return self._lease_out(database)
+            self._discard(database)
+            self._refill()
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"No healthy database connection available within {timeout}s")
+
+    def _lease_out(self, database: BaseDatabase) -> BaseDatabase:
+        with self._condition:
+            self._leased.add(database)
+        return database
+
+    def _is_healthy(self, database: BaseDatabase) -> bool:
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(database))
+        except Exception:
+            return False
+
+    def _refill(self):
+        # Connects new idle connections until the pool is back at min_size
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                database = self._connect()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                return  # the database is unreachable, acquire() will try again
+            with self._condition:
+                if not self._closed:
+                    self._idle.appendleft((database, time.monotonic()))
+                    self._condition.notify()
+                    database = None
+            if database is not None:
+                self._discard(database)
+
+    def release(self, database: BaseDatabase):
+        with self._condition:
+            if database not in self._leased:
+                raise ValueError("Connection is not leased from this pool (released twice?)")
+            self._leased.remove(database)
+            if not self._closed:
+                self._idle.append((database, time.monotonic()))
+                self._condition.notify()
+                database = None
+        if database is not None:
+            self._discard(database)
+        self.evict_idle()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        database = self.acquire(timeout)
+        try:
+            yield database
+        finally:
+            self.release(database)
+
+    def evict_idle(self) -> int:
+        expired = []
+        now = time.monotonic()
+        with self._condition:
+            # least recently used connections are on the left
+            while self._idle and self._size - len(expired) > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+                expired.append(self._idle.popleft()[0])
+        for database in expired:
+            self._discard(database)
+        self._refill()
+        return len(expired)
+
+    def close(self):
+        self._stop_evictor.set()
+        with self._condition:
+            self._closed = True
+            idle = [database for database, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        for database in idle:
+            self._discard(database)
+
+
+class FakeDatabase(BaseDatabase):
+    # In-process stand-in for a real database, connect and query latency are configurable so the pool can be benchmarked
+    def __init__(self, connect_latency: float = 0.02, query_latency: float = 0.001):
+        self.connect_latency = connect_latency
+        self.query_latency = query_latency
+        self.connected = False
+
+    def connect(self):
+        time.sleep(self.connect_latency)
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def is_alive(self) -> bool:
+        return self.connected
+
+    def query(self, sql: str):
+        if not self.connected:
+            raise ConnectionError("Database is not connected")
+        time.sleep(self.query_latency)
+        return f"result of {sql}"
+
+
+class PooledDatabaseService:
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def perform_operations(self, sql: str = "SELECT 1"):
+        with self.pool.lease() as database:
+            return database.query(sql)
+
+
+def main_pool_benchmark(threads_count=8, operations_per_thread=50, connect_latency=0.02, query_latency=0.001):
+    def run(operation):
+        workers = [threading.Thread(target=lambda: [operation() for _ in range(operations_per_thread)]) for _ in range(threads_count)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return (time.perf_counter() - start) / (threads_count * operations_per_thread)
+
+    def connect_per_operation():
+        database = FakeDatabase(connect_latency, query_latency)
+        database.connect()
+        database.query("SELECT 1")
+        database.disconnect()
+
+    pool = ConnectionPool(lambda: FakeDatabase(connect_latency, query_latency), min_size=2, max_size=4, health_check=FakeDatabase.is_alive)
+    service = PooledDatabaseService(pool)
+    print(f"connect per operation: {run(connect_per_operation) * 1000:.2f} ms/op")
+    print(f"pooled (max 4 connections): {run(service.perform_operations) * 1000:.2f} ms/op")
+    pool.close()
+
+
+
+###############################################################################################################################################################
+
+# Read-through query cache behind ICachable
+# ICachable.caching() above only prints. ReadThroughCache is a mixin that any BaseDatabase with a query() method can inherit next to BaseDatabase,
+# calling caching() turns on a real cache in front of query():
+# read()  -> returns the cached result if present and not expired, otherwise runs the query and stores the result
+# write() -> runs the statement and drops every cached result that read from a table the statement touches
+# Tables are found by tables_in(). When it can not tell every table a statement touches (quoted names, subqueries), read() does not cache
+# the result and write() clears the whole cache, a stale hit is worse than a miss.
+# The cache is an LRU bounded by a memory budget, every entry has a TTL. Sizes are estimated by estimate_size(), which follows lists, tuples,
+# dicts and sets (a result is usually a list of rows), or passed in by the caller when it knows better.
+# Every table has an invalidation generation. read() notes the generations before running the query and the result is only stored
+# if no write() invalidated one of its tables meanwhile, otherwise a result read before the write could be cached after it.
+# Databases that never call caching() behave exactly like before, which keeps them substitutable.
+
+import re
+import random
+import sys
+from collections import OrderedDict
+
+
+class QueryCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size, expires_at, tables), least recently used first
+        self._tables = {}  # table -> keys of the entries that read from it
+        self._generations = {}  # table -> number of times it was invalidated
+        self._clears = 0  # number of clear() calls, part of every generations() result
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        # Returns (found, value), a cached None is still a hit
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def generations(self, tables) -> tuple:
+        with self._lock:
+            return self._current_generations(tables)
+
+    def _current_generations(self, tables) -> tuple:
+        return (self._clears,) + tuple(self._generations.get(table, 0) for table in tables)
+
+    def put(self, key, value, tables=(), ttl: Optional[float] = None, size: Optional[int] = None, generations: Optional[tuple] = None):
+        # generations: result of generations(tables) taken before the value was read, the value is dropped if a table was invalidated since
+        tables = tuple(tables)
+        size = estimate_size(key) + (estimate_size(value) if size is None else size)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generations is not None and generations != self._current_generations(tables):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + (self.ttl if ttl is None else ttl), tuple(tables))
+            self.used_bytes += size
+            for table in tables:
+                self._tables.setdefault(table, set()).add(key)
+            while self.used_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, table) -> int:
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            keys = self._tables.pop(table, ())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._clears += 1
+            self._entries.clear()
+            self._tables.clear()
+            self.used_bytes = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self._entries), "bytes": self.used_bytes}
+
+    def _remove(self, key):
+        _, size, _, tables = self._entries.pop(key)
+        self.used_bytes -= size
+        for table in tables:
+            keys = self._tables.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tables[table]
+
+
+def estimate_size(value) -> int:
+    # sys.getsizeof only counts the object itself, for containers add what they hold. Shared objects are counted once.
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return size
+
+
+_TABLE_KEYWORD = re.compile(r"\b(FROM|JOIN|INTO|UPDATE|TABLE)\b\s*", re.IGNORECASE)
+_TABLE_NAME = re.compile(r"[A-Za-z_][\w.]*")
+# a FROM list ends at the next clause, a join, a subquery parenthesis or the end of the statement
+_FROM_LIST_END = re.compile(r"\b(?:WHERE|JOIN|INNER|LEFT|RIGHT|FULL|CROSS|NATURAL|ON|USING|GROUP|ORDER|HAVING|LIMIT|OFFSET|UNION|INTERSECT|EXCEPT)\b|[();]",
+                            re.IGNORECASE)
+_FROM_ITEM = re.compile(r"([A-Za-z_][\w.]*)(?:\s+(?:AS\s+)?[A-Za-z_]\w*)?", re.IGNORECASE)  # table with an optional alias
+
+
+def tables_in(sql: str) -> Optional[tuple]:
+    # Returns the lower cased tables the statement reads or writes, or None when they can not all be determined
+    # (quoted names like "Books", a subquery after FROM, ...), callers then have to assume it touches every table
+    tables = set()
+    for match in _TABLE_KEYWORD.finditer(sql):
+        rest = sql[match.end():]
+        if match.group(1).upper() == "FROM":
+            end = _FROM_LIST_END.search(rest)
+            items = rest[:end.start() if end else len(rest)].split(",")
+            names = [_FROM_ITEM.fullmatch(item.strip()) for item in items]
+            if not all(names):
+                return None
+            tables.update(name.group(1).lower() for name in names)
+        else:
+            name = _TABLE_NAME.match(rest)
+            if name is None:
+                return None
+            tables.add(name.group().lower())
+    return tuple(tables)
+
+
+class ReadThroughCache(ICachable):
+    cache: Optional[QueryCache] = None
+
+    def caching(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0):
+        self.cache = QueryCache(max_bytes, ttl)
+
+    def read(self, sql: str):
+        if self.cache is None:
+            return self.query(sql)
+        found, result = self.cache.get(sql)
+        if not found:
+            tables = tables_in(sql)
+            if tables is None:
+                return self.query(sql)  # no way to invalidate it correctly, so it is not cached
+            generations = self.cache.generations(tables)
+            result = self.query(sql)
+            self.cache.put(sql, result, tables, generations=generations)
+        return result
+
+    def write(self, sql: str):
+        result = self.query(sql)
+        if self.cache is not None:
+            tables = tables_in(sql)
+            if tables is None:
+                self.cache.clear()
+            for table in tables or ():
+                self.cache.invalidate(table)
+        return result
+
+
+class CachedFakeDatabase(FakeDatabase, ReadThroughCache):
+    pass
+
+
+def main_cache_benchmark(operations=2_000, distinct_queries=200, write_ratio=0.05, query_latency=0.005):
+    # Skewed workload: a few queries are very popular (like real traffic), a small share of operations are writes that invalidate a table
+    tables = ["books", "members", "loans", "seats"]
+    queries = [f"SELECT * FROM {tables[i % len(tables)]} WHERE id = {i}" for i in range(distinct_queries)]
+    weights = [1 / (rank + 1) for rank in range(distinct_queries)]
+
+    for cached in (False, True):
+        database = CachedFakeDatabase(connect_latency=0, query_latency=query_latency)
+        database.connect()
+        if cached:
+            database.caching(max_bytes=64 * 1024, ttl=30.0)
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(operations):
+            if rng.random() < write_ratio:
+                database.write(f"UPDATE {rng.choice(tables)} SET title = 'x' WHERE id = 1")
+            else:
+                database.read(rng.choices(queries, weights)[0])
+        elapsed = time.perf_counter() - start
+        stats = database.cache.stats() if cached else {}
+        print(f"cache={'on ' if cached else 'off'} {elapsed / operations * 1000:.2f} ms/op {stats}")
+
+
+
+###############################################################################################################################################################
+
+# Asyncio database interface
+# connect()/disconnect() and DatabaseService.perform_operations above block, on an asyncio server every blocking call ties up a thread.
+# AsyncBaseDatabase is the same contract with coroutines, plus query(). AsyncNetworkDatabase talks to a server over one TCP connection and
+# pipelines: it sends the next request without waiting for the previous answer, every request carries an id and a reader task matches the
+# answers to the waiting callers. So a couple of connections carry hundreds of concurrent operations.
+# Wire format (one line each way): "<id>\t<sql>\n" -> "<id>\t<result>\n"
+# start_stand_in_server() is a local server that answers every request after a fixed latency, concurrently, like a real database would.
+
+import asyncio
+import itertools
+
+
+class AsyncBaseDatabase(ABC):
+    @abstractmethod
+    async def connect(self):
+        pass
+
+    @abstractmethod
+    async def disconnect(self):
+        pass
+
+    @abstractmethod
+    async def query(self, sql: str):
+        pass
+
+
+class AsyncNetworkDatabase(AsyncBaseDatabase):
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}
+        self._ids = itertools.count()
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def disconnect(self):
+        if self._writer is None:
+            if self._reader_task is not None:
+                await asyncio.gather(self._reader_task, return_exceptions=True)
+            return
+        writer = self._writer
+        writer.close()
+        await writer.wait_closed()
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+        self._fail_pending(ConnectionError("Database disconnected"))
+
+    async def query(self, sql: str):
+        if self._writer is None:
+            raise ConnectionError("Database is not connected")
+        if "\n" in sql:
+            raise ValueError("Query must be a single line")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(f"{request_id}\t{sql}\n".encode())
+        await self._writer.drain()
+        return await future
+
+    async def _read_responses(self):
+        try:
+            while line := await self._reader.readline():
+                request_id, _, result = line.decode().rstrip("\n").partition("\t")
+                future = self._pending.pop(int(request_id), None)
+                if future is not None and not future.done():
+                    future.set_result(result)
+        finally:
+            # the connection is gone, later queries must fail instead of writing to a dead transport
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._fail_pending(ConnectionError("Database connection closed"))
+
+    def _fail_pending(self, error: Exception):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class AsyncDatabaseService:
+    # Spreads operations over a small, fixed set of connections, max_in_flight limits how many requests each connection pipelines
+    def __init__(self, databases: list, max_in_flight: int = 256):
+        self.databases = databases
+        self._limits = [asyncio.Semaphore(max_in_flight) for _ in databases]
+        self._next = itertools.cycle(range(len(databases)))
+
+    async def connect(self):
+        await asyncio.gather(*(database.connect() for database in self.databases))
+
+    async def disconnect(self):
+        await asyncio.gather(*(database.disconnect() for database in self.databases))
+
+    async def perform_operation(self, sql: str):
+        index = next(self._next)
+        async with self._limits[index]:
+            return await self.databases[index].query(sql)
+
+    async def perform_operations(self, queries) -> list:
+        return await asyncio.gather(*(self.perform_operation(sql) for sql in queries))
+
+
+async def start_stand_in_server(latency: float = 0.01, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+    async def answer(writer, request_id, sql):
+        await asyncio.sleep(latency)
+        if not writer.is_closing():
+            writer.write(f"{request_id}\tresult of {sql}\n".encode())
+
+    async def handle(reader, writer):
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                request_id, _, sql = line.decode().rstrip("\n").partition("\t")
+                task = asyncio.create_task(answer(writer, request_id, sql))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _async_benchmark(operations, connections, latency):
+    server = await start_stand_in_server(latency)
+    host, port = server.sockets[0].getsockname()[:2]
+    service = AsyncDatabaseService([AsyncNetworkDatabase(host, port) for _ in range(connections)])
+    await service.connect()
+
+    queries = [f"SELECT * FROM books WHERE id = {i}" for i in range(operations)]
+    start = time.perf_counter()
+    results = await service.perform_operations(queries)
+    elapsed = time.perf_counter() - start
+    correct = results == [f"result of {sql}" for sql in queries]
+    print(f"pipelined: {operations:,} operations over {connections} connections in {elapsed:.2f}s ({operations / elapsed:,.0f} ops/s), correct={correct}")
+
+    sequential = min(operations, 50)
+    start = time.perf_counter()
+    for sql in queries[:sequential]:
+        await service.databases[0].query(sql)
+    elapsed = time.perf_counter() - start
+    print(f"one at a time: {sequential} operations in {elapsed:.2f}s ({sequential / elapsed:,.0f} ops/s)")
+
+    await service.disconnect()
+    server.close()
+    await server.wait_closed()
+
+
+def main_async_benchmark(operations=10_000, connections=2, latency=0.01):
+    asyncio.run(_async_benchmark(operations, connections, latency))
+
+
+if __name__ == "__main__":
+    main()
+    # main_pool_benchmark()
+    # main_cache_benchmark()
+    # main_async_benchmark()
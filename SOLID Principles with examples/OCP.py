@@ -16,7 +16,14 @@ class Operation(object):
 
 
 # Good example
+import operator
 from abc import ABC, abstractmethod
+from array import array
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, batches then run on lists/arrays
+    numpy = None
 class Operation(ABC):
     @abstractmethod
     # A decorator indicating abstract methods.
@@ -30,11 +37,55 @@ class Operation(ABC):
     def performOperation(num1, num2):
         pass
 
+    # Kernel contract: a scalar function of two numbers, applied element wise (operator.add, math.hypot, a lambda, a staticmethod).
+    # It is read from the class and never bound to self. Mapped over lists/arrays a C function like operator.add has no Python level
+    # call per pair. Operations without a kernel fall back to performOperation per pair.
+    # Only operator module functions and NumPy ufuncs get whole NumPy arrays at once (they are element wise there too),
+    # any other kernel is still called per element on NumPy input, so a scalar kernel like max works for every input type.
+    kernel = None
+
+    def performBatch(self, nums1, nums2):
+        kernel = self._shortcut("kernel")
+        if kernel is None:
+            return list(map(self.performOperation, nums1, nums2))
+        if numpy is not None and (isinstance(nums1, numpy.ndarray) or isinstance(nums2, numpy.ndarray)):
+            nums1, nums2 = numpy.asarray(nums1), numpy.asarray(nums2)
+            if isinstance(kernel, numpy.ufunc) or getattr(kernel, "__module__", None) == "_operator":
+                return kernel(nums1, nums2)
+            return numpy.array(list(map(kernel, nums1.tolist(), nums2.tolist())))
+        results = list(map(kernel, nums1, nums2))
+        if isinstance(nums1, array) and isinstance(nums2, array) and nums1.typecode == nums2.typecode:
+            # the result keeps the input typecode when it fits, array("B") minus array("B") can go negative, then a list is returned
+            try:
+                return array(nums1.typecode, results)
+            except (OverflowError, TypeError):
+                pass
+        return results
+
+    # Python expression template of the operation, {0} and {1} are the operands. Used by OperationChain to fuse several operations
+    # into one generated function. Operations without an expression are called through performOperation inside that function.
+    expression = None
+
+    @classmethod
+    def _shortcut(cls, name):
+        # kernel and expression stand in for performOperation, so they are only used when they are defined in the same class as it.
+        # A subclass that overrides performOperation (class Doubled(Summation)) does not inherit the kernel/expression of its parent.
+        for klass in cls.__mro__:
+            if "performOperation" in vars(klass):
+                return getattr(klass, name) if name in vars(klass) else None
+        return None
+
 class Summation(Operation):
+    kernel = operator.add
+    expression = "({0} + {1})"
+
     def performOperation(self, num1, num2):
         return num1 + num2
 
 class Subtraction(Operation):
+    kernel = operator.sub
+    expression = "({0} - {1})"
+
     def performOperation(self, num1, num2):
         return num1 - num2
 
@@ -44,9 +95,101 @@ class Calculator:
 
     def performOperation(self, num1, num2):
         return self.operation.performOperation(num1, num2)
+
+    def performBatch(self, nums1, nums2):
+        if len(nums1) != len(nums2):
+            raise ValueError("Operand sequences must have the same length")
+        return self.operation.performBatch(nums1, nums2)
     
 def main():
     print(Calculator(Subtraction()).performOperation(1,2))
     print(Calculator(Summation()).performOperation(1,2))
 
-main()
\ No newline at end of file
+
+###############################################################################################################################################################
+
+# Batch benchmark
+# Multiplication has no kernel on purpose, it shows the fallback for custom operations
+
+import time
+import random
+
+class Multiplication(Operation):
+    def performOperation(self, num1, num2):
+        return num1 * num2
+
+def main_batch_benchmark(count=1_000_000):
+    nums1 = [random.randint(0, 1_000) for _ in range(count)]
+    nums2 = [random.randint(0, 1_000) for _ in range(count)]
+    inputs = {"list": (nums1, nums2), "array": (array("q", nums1), array("q", nums2))}
+    if numpy is not None:
+        inputs["numpy"] = (numpy.array(nums1), numpy.array(nums2))
+
+    for operation in (Summation(), Subtraction(), Multiplication()):
+        calculator = Calculator(operation)
+        start = time.perf_counter()
+        [calculator.performOperation(num1, num2) for num1, num2 in zip(nums1, nums2)]
+        print(f"{type(operation).__name__:<15} per pair        {time.perf_counter() - start:.3f}s")
+        for name, (batch1, batch2) in inputs.items():
+            start = time.perf_counter()
+            calculator.performBatch(batch1, batch2)
+            print(f"{type(operation).__name__:<15} batch ({name:<5})  {time.perf_counter() - start:.3f}s")
+
+###############################################################################################################################################################
+
+# Compiled operation chains
+# Chaining Calculators means one Python call (and a Calculator plus an Operation method lookup) and one intermediate result per step.
+# OperationChain takes steps of (operation, operand) and generates the source of one function for the whole chain, once, e.g.
+# [(Summation(), 3), (Subtraction(), 2)] -> def chain(value): value = (value + c0); value = (value - c1); return value
+# Operands are passed in as constants of the generated function, never formatted into the source.
+# Adding a new Operation needs no change here (OCP): with an expression it is inlined, without one its performOperation is called.
+# An expression is only inlined when it comes from the same class as performOperation (see Operation._shortcut).
+
+class OperationChain:
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.source, namespace = self._generate()
+        exec(compile(self.source, "<operation chain>", "exec"), namespace)
+        self.function = namespace["chain"]
+
+    def _generate(self):
+        # One assignment per step, so the nesting depth of the source does not grow with the length of the chain
+        namespace = {}
+        lines = ["def chain(value):"]
+        for index, (operation, operand) in enumerate(self.steps):
+            namespace[f"c{index}"] = operand
+            expression = operation._shortcut("expression")
+            if expression is not None:
+                lines.append(f"    value = {expression.format('value', f'c{index}')}")
+            else:
+                namespace[f"op{index}"] = operation.performOperation
+                lines.append(f"    value = op{index}(value, c{index})")
+        lines.append("    return value")
+        return "\n".join(lines) + "\n", namespace
+
+    def __call__(self, value):
+        return self.function(value)
+
+def main_chain_benchmark(count=1_000_000):
+    steps = [(Summation(), 3), (Subtraction(), 2), (Summation(), 10), (Multiplication(), 2), (Subtraction(), 7)]
+    calculators = [(Calculator(operation), operand) for operation, operand in steps]
+    chain = OperationChain(steps)
+    print(chain.source.strip())
+
+    def chained_calls(value):
+        for calculator, operand in calculators:
+            value = calculator.performOperation(value, operand)
+        return value
+
+    values = range(count)
+    start = time.perf_counter()
+    expected = [chained_calls(value) for value in values]
+    print(f"chained performOperation calls: {(time.perf_counter() - start) / count * 1e9:.0f} ns/value")
+    start = time.perf_counter()
+    result = [chain(value) for value in values]
+    print(f"compiled chain:                 {(time.perf_counter() - start) / count * 1e9:.0f} ns/value, same result={result == expected}")
+
+if __name__ == "__main__":
+    main()
+    # main_batch_benchmark()
+    # main_chain_benchmark()
\ No newline at end of file
@@ -58,4 +58,366 @@ class Transaction(object):
     
     def Withdraw(self, amount: float):
         self.account_to_perform_transaction_on.amount -= amount
-        return "Amount withdrawn successfully"
\ No newline at end of file
+        return "Amount withdrawn successfully"
+
+
+###############################################################################################################################################################
+
+# Ledger based transaction engine
+# Transaction above changes account.amount with += / -=, which is read -> add -> write and not atomic across threads (two deposits can lose one),
+# and nothing records that the balance changed.
+# TransactionEngine applies every deposit/withdraw by appending a LedgerEntry to an append-only ledger and updating the balance under a lock.
+# Lock striping: a fixed pool of locks, an account always maps to the same stripe, so transactions on different stripes run without waiting.
+# Each stripe also has its own ledger segment, appending never waits on a global ledger lock. The sequence number gives the global order.
+# ApplyBatch groups thousands of transactions by stripe and takes every stripe lock once per batch instead of once per transaction.
+# Single responsibility is kept: Account holds data, TransactionEngine is the only thing that changes balances.
+
+import itertools
+import random
+import threading
+import time
+from collections import namedtuple
+
+LedgerEntry = namedtuple("LedgerEntry", ["sequence", "account_id", "amount", "balance"])
+
+
+class LedgerAccount(object):
+    __slots__ = ("account_id", "amount")
+
+    def __init__(self, account_id, amount: float = 0):
+        self.account_id = account_id
+        self.amount = amount
+
+
+class TransactionEngine(object):
+    def __init__(self, accounts, stripes: int = 64):
+        self.accounts = {account.account_id: account for account in accounts}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._segments = [[] for _ in range(stripes)]
+        self._sequence = itertools.count()
+
+    def _stripe(self, account_id) -> int:
+        return hash(account_id) % len(self._locks)
+
+    def _apply(self, segment, account_id, amount):
+        account = self.accounts[account_id]
+        account.amount += amount
+        segment.append(LedgerEntry(next(self._sequence), account_id, amount, account.amount))
+
+    def Deposit(self, account_id, amount: float):
+        stripe = self._stripe(account_id)
+        with self._locks[stripe]:
+            self._apply(self._segments[stripe], account_id, amount)
+        return "Amount deposited successfully"
+
+    def Withdraw(self, account_id, amount: float):
+        stripe = self._stripe(account_id)
+        with self._locks[stripe]:
+            self._apply(self._segments[stripe], account_id, -amount)
+        return "Amount withdrawn successfully"
+
+    def ApplyBatch(self, transactions) -> int:
+        # transactions: iterable of (account_id, amount), a positive amount is a deposit and a negative amount is a withdrawal
+        # Unknown accounts are rejected before anything is applied, so a batch is never half applied because of a typo
+        by_stripe = {}
+        for account_id, amount in transactions:
+            if account_id not in self.accounts:
+                raise KeyError(f"Unknown account: {account_id}")
+            by_stripe.setdefault(self._stripe(account_id), []).append((account_id, amount))
+        for stripe in sorted(by_stripe):
+            segment = self._segments[stripe]
+            with self._locks[stripe]:
+                for account_id, amount in by_stripe[stripe]:
+                    self._apply(segment, account_id, amount)
+        return sum(len(batch) for batch in by_stripe.values())
+
+    def Entries(self) -> list:
+        # The full ledger in global order
+        entries = []
+        for lock, segment in zip(self._locks, self._segments):
+            with lock:
+                entries.extend(segment)
+        entries.sort()
+        return entries
+
+
+def main_ledger_benchmark(accounts_count=1_000, threads_count=8, batches_per_thread=20, batch_size=5_000):
+    def run(apply):
+        accounts = [LedgerAccount(i, 1_000) for i in range(accounts_count)]
+        engine = TransactionEngine(accounts)
+        # batches are generated up front so only applying them is timed
+        batches = []
+        for thread_index in range(threads_count):
+            rng = random.Random(thread_index)
+            batches.append([[(rng.randrange(accounts_count), rng.randint(-100, 100)) for _ in range(batch_size)] for _ in range(batches_per_thread)])
+
+        def worker(thread_index):
+            for batch in batches[thread_index]:
+                apply(engine, batch)
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        expected = [1_000] * accounts_count
+        for thread_batches in batches:
+            for batch in thread_batches:
+                for account_id, amount in batch:
+                    expected[account_id] += amount
+        balances_correct = all(account.amount == expected[account.account_id] for account in accounts)
+        replayed = {}
+        for entry in engine.Entries():
+            replayed[entry.account_id] = replayed.get(entry.account_id, 1_000) + entry.amount
+        ledger_correct = all(replayed.get(account.account_id, 1_000) == account.amount for account in accounts)
+        return threads_count * batches_per_thread * batch_size / elapsed, balances_correct and ledger_correct
+
+    def one_by_one(engine, batch):
+        for account_id, amount in batch:
+            if amount >= 0:
+                engine.Deposit(account_id, amount)
+            else:
+                engine.Withdraw(account_id, -amount)
+
+    for name, apply in (("Deposit/Withdraw per call", one_by_one), ("ApplyBatch", TransactionEngine.ApplyBatch)):
+        rate, correct = run(apply)
+        print(f"{name:<26} {rate:12,.0f} transactions/s   correct={correct}")
+
+
+
+###############################################################################################################################################################
+
+# Persistent account store
+# The Account class above declares Add, Update, Delete and Get with nothing behind them. AccountStore is that storage, still with one job: keeping accounts.
+# Hash index -> a dict from account id to record, every Get/Update/Delete is O(1)
+# Write-ahead log (WAL) -> every change is appended to a log file before it is acknowledged, so it survives a crash
+# Group commit -> fsync is the slow part, so writers only queue their log line and a background flusher writes and fsyncs everything queued
+#                 so far in one go. Many concurrent writers share one fsync instead of paying one each.
+# Snapshots -> every snapshot_every changes the whole index is written to a snapshot file in the background and the log is cut there,
+#              so startup loads the snapshot and replays only the log written after it, instead of the full history.
+# Files in the directory: snapshot.pickle and wal-<first sequence number>.log segments
+# Records are kept in the index as their JSON text, the same text that goes into the log. Get decodes a fresh copy every time, so a caller
+# changing the returned dict cannot change the store behind the log's back, and a snapshot holds exactly what the log would replay.
+# Account ids must be int or str, the types that come back unchanged from JSON.
+
+import json
+import os
+import pickle
+import tempfile
+
+
+class AccountStore(object):
+    def __init__(self, directory, snapshot_every: int = 1_000_000, flush_interval: float = 0.002):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._index = {}
+        self._sequence = 0
+        self._snapshot_sequence = 0
+        self._recover()
+
+        self._pending = []
+        self._durable_sequence = self._sequence
+        self._state_lock = threading.Lock()
+        self._durable = threading.Condition(self._state_lock)
+        self._io_lock = threading.Lock()  # always taken before _state_lock
+        self._wal = open(self._segment_path(self._sequence + 1), "a", encoding="utf-8")
+        self._snapshot_thread = None
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def _segment_path(self, first_sequence):
+        return os.path.join(self.directory, f"wal-{first_sequence:020d}.log")
+
+    def _segments(self):
+        return sorted(name for name in os.listdir(self.directory) if name.startswith("wal-") and name.endswith(".log"))
+
+    def _recover(self):
+        snapshot_path = os.path.join(self.directory, "snapshot.pickle")
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "rb") as f:
+                self._snapshot_sequence, self._index = pickle.load(f)
+            self._sequence = self._snapshot_sequence
+        for name in self._segments():
+            with open(os.path.join(self.directory, name), "rb+") as f:
+                valid_length = 0
+                for line in f:
+                    try:
+                        sequence, operation, account_id, record = json.loads(line)
+                    except ValueError:
+                        # torn write at the end of the log, it was never acknowledged, cut it off so new records do not append to it
+                        f.truncate(valid_length)
+                        break
+                    valid_length += len(line)
+                    if sequence <= self._sequence:
+                        continue
+                    self._sequence = sequence
+                    if operation == "delete":
+                        self._index.pop(account_id, None)
+                    else:
+                        self._index[account_id] = json.dumps(record)
+
+    def _write(self, operation, account_id, record, wait):
+        if not isinstance(account_id, (int, str)) or isinstance(account_id, bool):
+            raise TypeError(f"Account id must be int or str, got {type(account_id).__name__}")
+        data = json.dumps(record)  # also copies the record, later changes by the caller do not reach the store
+        line_tail = f", {json.dumps(operation)}, {json.dumps(account_id)}, {data}]\n"  # the sequence number goes in front
+        with self._state_lock:
+            if self._closed:
+                raise RuntimeError("Account store is closed")
+            if operation == "add" and account_id in self._index:
+                raise KeyError(f"Account already exists: {account_id}")
+            if operation != "add" and account_id not in self._index:
+                raise KeyError(f"Unknown account: {account_id}")
+            self._sequence += 1
+            sequence = self._sequence
+            self._pending.append(f"[{sequence}{line_tail}")
+            if operation == "delete":
+                del self._index[account_id]
+            else:
+                self._index[account_id] = data
+            if sequence - self._snapshot_sequence >= self.snapshot_every and self._snapshot_thread is None:
+                self._snapshot_thread = threading.Thread(target=self.Snapshot, daemon=True)
+                self._snapshot_thread.start()
+            if wait:
+                while self._durable_sequence < sequence:
+                    self._durable.wait()
+        return sequence
+
+    def Add(self, account_id, record, wait: bool = True):
+        return self._write("add", account_id, record, wait)
+
+    def Update(self, account_id, record, wait: bool = True):
+        return self._write("update", account_id, record, wait)
+
+    def Delete(self, account_id, wait: bool = True):
+        return self._write("delete", account_id, None, wait)
+
+    def Get(self, account_id):
+        data = self._index.get(account_id)
+        return None if data is None else json.loads(data)
+
+    def __len__(self):
+        return len(self._index)
+
+    def _flush_pending(self):
+        # caller holds _io_lock
+        with self._state_lock:
+            lines, self._pending = self._pending, []
+            sequence = self._sequence
+        self._write_durable(lines, sequence)
+
+    def _write_durable(self, lines, sequence):
+        # caller holds _io_lock, lines are every pending write up to and including sequence
+        if lines:
+            self._wal.write("".join(lines))
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+        with self._state_lock:
+            self._durable_sequence = sequence
+            self._durable.notify_all()
+
+    def _flush_loop(self):
+        while not self._closed:
+            time.sleep(self.flush_interval)
+            with self._io_lock:
+                if not self._wal.closed:
+                    self._flush_pending()
+
+    def Flush(self):
+        with self._io_lock:
+            self._flush_pending()
+
+    def Snapshot(self):
+        with self._io_lock:
+            # the copy and the pending lines are taken in one hold of _state_lock, so every write up to sequence is in the copy
+            # and in the old segment, and every later write goes to the new segment
+            with self._state_lock:
+                records = dict(self._index)
+                lines, self._pending = self._pending, []
+                sequence = self._sequence
+            self._write_durable(lines, sequence)
+            self._wal.close()
+            self._wal = open(self._segment_path(sequence + 1), "a", encoding="utf-8")
+
+        snapshot_path = os.path.join(self.directory, "snapshot.pickle")
+        with tempfile.NamedTemporaryFile("wb", dir=self.directory, delete=False) as f:
+            pickle.dump((sequence, records), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f.name, snapshot_path)
+
+        current = os.path.basename(self._segment_path(sequence + 1))
+        for name in self._segments():
+            if name < current:
+                os.remove(os.path.join(self.directory, name))
+        with self._state_lock:
+            self._snapshot_sequence = sequence
+            self._snapshot_thread = None
+
+    def Close(self):
+        snapshot_thread = self._snapshot_thread
+        if snapshot_thread is not None and snapshot_thread is not threading.current_thread():
+            snapshot_thread.join()
+        with self._io_lock:
+            # closed first, so no write can be queued after the final flush
+            with self._state_lock:
+                self._closed = True
+            self._flush_pending()
+            self._wal.close()
+        self._flusher.join()
+
+
+def main_account_store_benchmark(accounts_count=1_000_000, threads_count=32, updates_per_thread=500):
+    # Pass accounts_count=10_000_000 for the full size run, it needs a few GB of memory
+    with tempfile.TemporaryDirectory() as directory:
+        store = AccountStore(directory, snapshot_every=accounts_count)
+
+        start = time.perf_counter()
+        for account_id in range(accounts_count):
+            store.Add(account_id, {"name": f"Account {account_id}", "amount": 0}, wait=False)
+        store.Flush()
+        elapsed = time.perf_counter() - start
+        print(f"bulk Add of {accounts_count:,} accounts: {elapsed:.2f}s ({accounts_count / elapsed:,.0f} ops/s)")
+
+        def worker(thread_index):
+            rng = random.Random(thread_index)
+            for _ in range(updates_per_thread):
+                account_id = rng.randrange(accounts_count)
+                store.Update(account_id, {"name": f"Account {account_id}", "amount": rng.randint(0, 1_000)})
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        updates = threads_count * updates_per_thread
+        print(f"durable Update from {threads_count} threads (group commit): {updates / elapsed:,.0f} ops/s")
+
+        start = time.perf_counter()
+        for _ in range(100_000):
+            store.Get(random.randrange(accounts_count))
+        print(f"Get: {100_000 / (time.perf_counter() - start):,.0f} ops/s")
+
+        expected = {account_id: store.Get(account_id) for account_id in range(0, accounts_count, 997)}
+        store.Close()
+
+        start = time.perf_counter()
+        store = AccountStore(directory, snapshot_every=accounts_count)
+        elapsed = time.perf_counter() - start
+        correct = all(store.Get(account_id) == record for account_id, record in expected.items())
+        print(f"recovery (snapshot + log tail) of {len(store):,} accounts: {elapsed:.2f}s, correct={correct}")
+        store.Close()
+
+
+if __name__ == "__main__":
+    main_ledger_benchmark()
+    # main_account_store_benchmark()